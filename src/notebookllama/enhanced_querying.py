@@ -269,15 +269,18 @@ class EnhancedQueryEngine:
             print(f"Error getting document by name: {e}")
             return None
     
-    async def get_all_documents(self) -> list:
+    async def get_all_documents(self, include_content: bool = True) -> list:
         """
         Get all documents from the database
         
+        Args:
+            include_content: Also load the full document text
+            
         Returns:
             List of all documents
         """
         try:
-            return self.document_manager.get_documents()
+            return self.document_manager.get_documents(include_content=include_content)
         except Exception as e:
             print(f"Error getting all documents: {e}")
             return []
@@ -290,12 +293,13 @@ class EnhancedQueryEngine:
             Dictionary with stats
         """
         try:
-            documents = await self.get_all_documents()
+            # Listing fields only; the content total is summed in SQL
+            documents = await self.get_all_documents(include_content=False)
             
             stats = {
                 "total_documents": len(documents),
                 "processed_documents": sum(1 for doc in documents if doc.is_processed),
-                "total_content_length": sum(len(doc.content) for doc in documents),
+                "total_content_length": self.document_manager.get_total_content_length(),
                 "document_names": [doc.document_name for doc in documents],
                 "recent_documents": [
                     doc.document_name for doc in sorted(
@@ -5,7 +5,7 @@ Provides a unified interface for MCP tools and integrates them with NotebookLlam
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Awaitable
 from dataclasses import dataclass
 
 from .client import MCPClientManager
@@ -200,8 +200,16 @@ class MCPToolProxy:
 
         return capabilities
 
-    async def health_check(self) -> Dict[str, Any]:
-        """Perform health check on all MCP connections"""
+    async def health_check(
+        self,
+        on_server: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Perform health check on all MCP connections
+
+        Args:
+            on_server: Optional async callback invoked with each server's
+                health as soon as it has been checked
+        """
         health_status = {
             "overall_status": "healthy",
             "servers": {},
@@ -240,6 +248,9 @@ class MCPToolProxy:
             health_status["servers"][server_name] = server_health
             health_status["total_tools"] += server_health["tools_count"]
 
+            if on_server:
+                await on_server(server_name, server_health)
+
         # Determine overall status
         if health_status["errors"]:
             if len(health_status["errors"]) == len(connection_status):
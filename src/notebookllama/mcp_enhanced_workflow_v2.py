@@ -37,6 +37,9 @@ from .mcp_client import MCPClientManager, MCPToolProxy
 
 logger = logging.getLogger(__name__)
 
+# MCP servers whose tools the workflow steps actually make use of
+MCP_CAPABILITY_SERVERS = ("memory", "filesystem", "postgres")
+
 
 class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
     """
@@ -66,6 +69,8 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
         self.mcp_proxy = None
         self._mcp_initialized = False
         self._mcp_available_tools = {}
+        self._total_tools = 0
+        self._any_caps = False
 
         if self.enable_mcp:
             self._init_mcp_services()
@@ -77,13 +82,19 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
             config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mcp_config.json')
             if os.path.exists(config_path):
                 self.mcp_client = MCPClientManager(config_path)
+                if not self.mcp_client.config.get_enabled_servers():
+                    # Nothing to connect to - skip the initialization fan-out entirely
+                    self.logger.info("No MCP servers enabled in %s, MCP features disabled", config_path)
+                    self.mcp_client = None
+                    self.enable_mcp = False
+                    return
                 self.mcp_proxy = MCPToolProxy(self.mcp_client)
                 self.logger.info("MCP services initialized")
             else:
-                self.logger.warning(f"MCP config not found at {config_path}, MCP features disabled")
+                self.logger.warning("MCP config not found at %s, MCP features disabled", config_path)
                 self.enable_mcp = False
         except Exception as e:
-            self.logger.error(f"Failed to initialize MCP services: {e}")
+            self.logger.error("Failed to initialize MCP services: %s", e, exc_info=True)
             self.enable_mcp = False
 
     async def _initialize_mcp_connections(self) -> None:
@@ -97,16 +108,18 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
 
             # Get available tools
             self._mcp_available_tools = await self.mcp_proxy.get_tool_capabilities()
+            self._total_tools = sum(len(tools) for tools in self._mcp_available_tools.values())
+            self._any_caps = any(server in self._mcp_available_tools for server in MCP_CAPABILITY_SERVERS)
 
             # Perform health check
             health = await self.mcp_proxy.health_check()
-            self.logger.info(f"MCP Health Status: {health['overall_status']}")
-            self.logger.info(f"Available tools: {health['total_tools']} from {len(health['servers'])} servers")
+            self.logger.info("MCP Health Status: %s", health['overall_status'])
+            self.logger.info("Available tools: %s from %s servers", health['total_tools'], len(health['servers']))
 
             self._mcp_initialized = True
 
         except Exception as e:
-            self.logger.error(f"Failed to initialize MCP connections: {e}")
+            self.logger.error("Failed to initialize MCP connections: %s", e, exc_info=True)
             self.enable_mcp = False
 
     @step
@@ -126,6 +139,10 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
         # Run parent's document processing first
         document_event = await super().process_document(ctx, ev)
 
+        # No usable MCP capabilities - skip all per-step enhancement work
+        if not self._any_caps:
+            return document_event
+
         # If MCP is enabled, add MCP enhancements
         if self.enable_mcp and self._mcp_initialized:
             try:
@@ -145,7 +162,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
 
                     self.logger.info("Added MCP enhancements to document processing")
             except Exception as e:
-                self.logger.error(f"MCP enhancement failed: {e}")
+                self.logger.error("MCP enhancement failed: %s", e, exc_info=True)
                 # Continue without MCP enhancements
 
         return document_event
@@ -163,6 +180,9 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
         # Run parent's content enhancement first
         enhanced_event = await super().enhance_content(ctx, ev)
 
+        if not self._any_caps:
+            return enhanced_event
+
         # If MCP is enabled, add MCP-based enhancements
         if self.enable_mcp and self._mcp_initialized:
             try:
@@ -189,7 +209,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                 self.logger.info("Added MCP enhancements to content")
 
             except Exception as e:
-                self.logger.error(f"MCP content enhancement failed: {e}")
+                self.logger.error("MCP content enhancement failed: %s", e, exc_info=True)
                 # Continue without MCP enhancements
 
         return enhanced_event
@@ -207,26 +227,34 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
         # Run parent's notebook generation
         notebook_event = await super().generate_notebook(ctx, ev)
 
+        if not self._any_caps:
+            return notebook_event
+
         # If MCP is enabled, add MCP status to notebook
         if self.enable_mcp and self._mcp_initialized:
             try:
+                # Collect additions and write each field once at the end
+                summary_parts = [notebook_event.formatted_summary]
+                highlights_parts = [notebook_event.formatted_highlights]
+
                 # Add MCP status section to formatted summary
                 mcp_status = await self._get_mcp_status_summary()
                 if mcp_status:
-                    notebook_event.formatted_summary += f"\n\n## MCP Integration Status\n\n{mcp_status}"
+                    summary_parts.append(f"\n\n## MCP Integration Status\n\n{mcp_status}")
 
                 # Add similar documents section if found
                 similar_docs = ev.enhancement_metadata.get("similar_documents", [])
                 if similar_docs:
-                    similar_section = "\n\n## Similar Documents Found\n\n"
-                    for doc in similar_docs[:3]:  # Limit to top 3
-                        similar_section += f"- {doc}\n"
-                    notebook_event.formatted_highlights += similar_section
+                    highlights_parts.append("\n\n## Similar Documents Found\n\n")
+                    highlights_parts.extend(f"- {doc}\n" for doc in similar_docs[:3])  # Limit to top 3
+
+                notebook_event.formatted_summary = "".join(summary_parts)
+                notebook_event.formatted_highlights = "".join(highlights_parts)
 
                 self.logger.info("Added MCP insights to notebook")
 
             except Exception as e:
-                self.logger.error(f"MCP notebook enhancement failed: {e}")
+                self.logger.error("MCP notebook enhancement failed: %s", e, exc_info=True)
                 # Continue without MCP enhancements
 
         return notebook_event
@@ -260,7 +288,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                 }
 
         except Exception as e:
-            self.logger.error(f"Failed to get MCP file metadata: {e}")
+            self.logger.error("Failed to get MCP file metadata: %s", e, exc_info=True)
 
         return metadata
 
@@ -278,9 +306,9 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                     }]
                 }
             )
-            self.logger.info(f"Stored document '{title}' in MCP memory")
+            self.logger.info("Stored document '%s' in MCP memory", title)
         except Exception as e:
-            self.logger.error(f"Failed to store in MCP memory: {e}")
+            self.logger.error("Failed to store in MCP memory: %s", e, exc_info=True)
 
     async def _find_similar_documents(self, summary: str, topics: List[str]) -> List[str]:
         """Find similar documents using MCP memory"""
@@ -301,7 +329,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
             similar = list(set(similar))
 
         except Exception as e:
-            self.logger.error(f"Failed to find similar documents: {e}")
+            self.logger.error("Failed to find similar documents: %s", e, exc_info=True)
 
         return similar[:5]  # Return top 5
 
@@ -337,23 +365,23 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                     "create_relations",
                     {"relations": relations[:10]}  # Limit total relations
                 )
-                self.logger.info(f"Created {len(relations)} knowledge graph relationships")
+                self.logger.info("Created %d knowledge graph relationships", len(relations))
 
         except Exception as e:
-            self.logger.error(f"Failed to create knowledge graph: {e}")
+            self.logger.error("Failed to create knowledge graph: %s", e, exc_info=True)
 
     async def _get_database_insights(self, title: str) -> Dict[str, Any]:
         """Get database insights using MCP PostgreSQL tools"""
         insights = {}
 
         try:
-            # Query for document statistics
+            # Query for document statistics - parameterized, not string-formatted
             result = await self.mcp_proxy.mcp_client.call_tool(
                 "postgres",
                 "query",
                 {
-                    "query": "SELECT COUNT(*) as total_docs FROM documents",
-                    "params": []
+                    "query": "SELECT COUNT(*) as total_docs FROM documents_enhanced WHERE document_name = $1",
+                    "params": [title]
                 }
             )
 
@@ -361,7 +389,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                 insights["total_documents"] = result.get("rows", [[0]])[0][0]
 
         except Exception as e:
-            self.logger.error(f"Failed to get database insights: {e}")
+            self.logger.error("Failed to get database insights: %s", e, exc_info=True)
 
         return insights
 
@@ -385,7 +413,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
             return "\n".join(status)
 
         except Exception as e:
-            self.logger.error(f"Failed to get MCP status: {e}")
+            self.logger.error("Failed to get MCP status: %s", e, exc_info=True)
             return "MCP status unavailable"
 
     async def get_mcp_status(self) -> Dict[str, Any]:
@@ -405,7 +433,7 @@ class MCPEnhancedWorkflowV2(EnhancedWorkflowV2):
                 "initialized": self._mcp_initialized,
                 "health": health,
                 "available_servers": list(self._mcp_available_tools.keys()),
-                "total_tools": sum(len(tools) for tools in self._mcp_available_tools.values())
+                "total_tools": self._total_tools
             }
         except Exception as e:
             return {
@@ -448,7 +476,7 @@ async def run_mcp_enhanced_workflow_v2(
     Returns:
         Dictionary containing processing results
     """
-    logger.info(f"Starting MCP enhanced workflow v2 for: {document_title}")
+    logger.info("Starting MCP enhanced workflow v2 for: %s", document_title)
 
     try:
         # Create and run workflow
@@ -487,7 +515,7 @@ async def run_mcp_enhanced_workflow_v2(
         }
 
     except Exception as e:
-        logger.error(f"Workflow failed with exception: {e}")
+        logger.error("Workflow failed with exception: %s", e, exc_info=True)
         return {
             "status": "failed",
             "error": str(e),
@@ -1,15 +1,28 @@
 """
 MCP Management UI Components for Streamlit
 Provides user interface for managing MCP server connections and configurations
+
+Optional dependency: uvloop - when installed, MCP async work runs on a uvloop
+event loop for lower dispatch overhead on the many small stdio/JSON-RPC calls.
 """
 
 import streamlit as st
+import pandas as pd
 import asyncio
+import copy
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from datetime import datetime
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 try:
     from .mcp_client import MCPClientManager, MCPConfig, MCPToolProxy
     from .mcp_enhanced_workflow_v2 import MCPEnhancedWorkflowV2, create_mcp_enhanced_workflow_v2
@@ -23,6 +36,153 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Session state defaults for the MCP UI (copied per session on first use)
+_MCP_DEFAULTS: Dict[str, Any] = {
+    "mcp_config": None,
+    "mcp_client": None,
+    "mcp_proxy": None,
+    "mcp_connection_status": {},
+    "mcp_available_tools": {},
+    "mcp_health_status": {},
+    "mcp_enable_integration": True,
+    "mcp_last_refresh_ts": None,
+}
+
+_STATUS_COLORS = {
+    "healthy": "🟢",
+    "degraded": "🟡",
+    "unhealthy": "🔴",
+    "unknown": "⚪"
+}
+
+# Short-lived memo of the last health check so "refresh then test" reuses it
+CACHE_TTL = 5.0
+_HEALTH_CACHE: Dict[str, Any] = {"ts": 0.0, "proxy": None, "value": None}
+
+async def _cached_health(
+    proxy: MCPToolProxy,
+    force: bool = False,
+    on_server: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Return the proxy health check, reusing a result younger than CACHE_TTL"""
+    if (
+        not force
+        and _HEALTH_CACHE["proxy"] is proxy
+        and time.monotonic() - _HEALTH_CACHE["ts"] < CACHE_TTL
+    ):
+        health = _HEALTH_CACHE["value"]
+        if on_server:
+            for server_name, server_info in health.get("servers", {}).items():
+                await on_server(server_name, server_info)
+        return health
+
+    health = await proxy.health_check(on_server=on_server)
+    _HEALTH_CACHE.update(ts=time.monotonic(), proxy=proxy, value=health)
+    return health
+
+def _format_refresh_time(ts: Optional[float]) -> Optional[str]:
+    """Format a refresh timestamp for display, only when it is shown"""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+@st.cache_resource
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Persistent event loop on a daemon thread so cached MCP transports outlive a single click"""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="mcp-ui-loop", daemon=True).start()
+    return loop
+
+def _run_async(coro):
+    """Run a coroutine on the shared loop; safe from concurrent session threads"""
+    # The loop thread has no ScriptRunContext: coroutines sent here must not
+    # touch st.* or session_state, callers apply their results afterwards
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()
+
+async def _fetch_mcp_status(
+    client: MCPClientManager,
+    proxy: MCPToolProxy
+) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """Fetch health status and available tools concurrently (runs on the loop thread)"""
+    # Reuse the persistent MCP client; connecting is a no-op once done
+    await proxy.initialize()
+    health_status, available_tools = await asyncio.gather(
+        _cached_health(proxy, force=True),
+        client.list_all_tools()
+    )
+    return health_status, available_tools
+
+@st.cache_resource(max_entries=4)
+def _load_mcp_config_at(path: str, mtime: float) -> MCPConfig:
+    """Load the MCP configuration, shared across reruns until the file changes"""
+    return MCPConfig(path)
+
+def _load_mcp_config(path: str = "mcp_config.json") -> MCPConfig:
+    """MCP configuration for the file's current contents (the simple UI rewrites it too)"""
+    return _load_mcp_config_at(path, _config_mtime(path))
+
+def _config_mtime(path: str = "mcp_config.json") -> float:
+    """Modification time of the MCP config file, 0.0 when it is missing"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+@st.cache_resource
+def _mcp_proxy_holder() -> Dict[str, Any]:
+    """Process-wide slot for the MCP client, tagged with the config mtime it was built from"""
+    return {"lock": threading.Lock(), "mtime": None, "client": None, "proxy": None}
+
+def _get_mcp_proxy() -> Tuple[MCPClientManager, MCPToolProxy]:
+    """Share the MCP client across reruns, rebuilding it when mcp_config.json changes"""
+    holder = _mcp_proxy_holder()
+    mtime = _config_mtime()
+    with holder["lock"]:
+        if holder["client"] is None or holder["mtime"] != mtime:
+            # Either UI may have rewritten the server set; reconnect from the new file
+            _shutdown_client(holder["client"])
+            client = MCPClientManager("mcp_config.json")
+            holder.update(mtime=mtime, client=client, proxy=MCPToolProxy(client))
+        return holder["client"], holder["proxy"]
+
+def _reset_mcp_proxy() -> None:
+    """Disconnect the shared MCP client so the next use rebuilds it"""
+    holder = _mcp_proxy_holder()
+    with holder["lock"]:
+        _shutdown_client(holder["client"])
+        holder.update(mtime=None, client=None, proxy=None)
+
+def _shutdown_client(client: Optional[MCPClientManager]) -> None:
+    """Close a replaced MCP client's server connections"""
+    if client is None:
+        return
+    try:
+        _run_async(client.shutdown())
+    except Exception as e:
+        logger.error(f"Error shutting down MCP client: {e}")
+
+@st.cache_data
+def _config_bytes(path: str, mtime: float) -> bytes:
+    """Serialized MCP config for export, re-read and re-encoded only when the file changes"""
+    # Read from disk here: the cache_resource config is not keyed by mtime
+    return json.dumps(MCPConfig(path).servers, indent=2).encode()
+
+@st.cache_data
+def _parse_uploaded_config(data: bytes) -> Dict[str, Any]:
+    """Parse an uploaded config once instead of on every rerun"""
+    return json.loads(data)
+
+@st.cache_data
+def _flatten_tools(fingerprint: str, _tools: Dict[str, List[Any]]) -> Dict[str, List[Tuple[str, str]]]:
+    """Flatten tool objects to (name, description) pairs, cached per refresh"""
+    return {
+        server_name: [
+            (getattr(tool, 'name', 'Unknown Tool'), getattr(tool, 'description', 'No description available'))
+            for tool in server_tools
+        ]
+        for server_name, server_tools in _tools.items()
+    }
+
 class MCPUIManager:
     """Manages MCP UI components and state"""
 
@@ -34,29 +194,14 @@ class MCPUIManager:
 
     def _initialize_session_state(self):
         """Initialize session state variables for MCP UI"""
-        if 'mcp_config' not in st.session_state:
-            st.session_state.mcp_config = None
-
-        if 'mcp_client' not in st.session_state:
-            st.session_state.mcp_client = None
-
-        if 'mcp_connection_status' not in st.session_state:
-            st.session_state.mcp_connection_status = {}
-
-        if 'mcp_available_tools' not in st.session_state:
-            st.session_state.mcp_available_tools = {}
-
-        if 'mcp_health_status' not in st.session_state:
-            st.session_state.mcp_health_status = {}
-
-        if 'mcp_enable_integration' not in st.session_state:
-            st.session_state.mcp_enable_integration = True
+        if 'mcp_init_done' in st.session_state:
+            return
 
-        if 'mcp_enabled' not in st.session_state:
-            st.session_state.mcp_enabled = st.session_state.mcp_enable_integration
+        for key, value in _MCP_DEFAULTS.items():
+            st.session_state.setdefault(key, copy.copy(value))
+        st.session_state.setdefault('mcp_enabled', st.session_state['mcp_enable_integration'])
 
-        if 'mcp_last_refresh' not in st.session_state:
-            st.session_state.mcp_last_refresh = None
+        st.session_state.mcp_init_done = True
 
     def render_mcp_sidebar(self):
         """Render MCP management section in sidebar"""
@@ -71,34 +216,41 @@ class MCPUIManager:
         )
         st.session_state.mcp_enable_integration = enable_mcp
 
-        if enable_mcp:
-            # Connection status indicator
-            if st.session_state.mcp_health_status:
-                status = st.session_state.mcp_health_status.get("overall_status", "unknown")
-                if status == "healthy":
-                    st.sidebar.success("🟢 MCP Connected")
-                elif status == "degraded":
-                    st.sidebar.warning("🟡 MCP Partially Connected")
-                else:
-                    st.sidebar.error("🔴 MCP Disconnected")
-            else:
-                st.sidebar.info("⚪ MCP Not Initialized")
-
-            # Quick actions
-            if st.sidebar.button("🔄 Refresh MCP", key="mcp_refresh_sidebar"):
-                asyncio.run(self.refresh_mcp_status())
-
-            # Show basic stats
-            if st.session_state.mcp_health_status:
-                total_tools = st.session_state.mcp_health_status.get("total_tools", 0)
-                servers = st.session_state.mcp_health_status.get("servers", {})
-                connected_servers = sum(1 for server in servers.values() if server.get("connected", False))
+        if not enable_mcp:
+            st.sidebar.info("MCP Integration disabled")
+            return
 
-                st.sidebar.metric("Connected Servers", f"{connected_servers}/{len(servers)}")
-                st.sidebar.metric("Available Tools", total_tools)
+        health = st.session_state.mcp_health_status or {}
 
+        # Connection status indicator
+        if health:
+            status = health.get("overall_status", "unknown")
+            if status == "healthy":
+                st.sidebar.success("🟢 MCP Connected")
+            elif status == "degraded":
+                st.sidebar.warning("🟡 MCP Partially Connected")
+            else:
+                st.sidebar.error("🔴 MCP Disconnected")
         else:
-            st.sidebar.info("MCP Integration disabled")
+            st.sidebar.info("⚪ MCP Not Initialized")
+
+        # Quick actions
+        if st.sidebar.button("🔄 Refresh MCP", key="mcp_refresh_sidebar"):
+            self.refresh_mcp_status()
+            health = st.session_state.mcp_health_status or {}
+
+        # Show basic stats
+        if health:
+            # Single pass: server count, connected count and tool count
+            server_count = connected_servers = tools_count = 0
+            for server in health.get("servers", {}).values():
+                server_count += 1
+                connected_servers += bool(server.get("connected"))
+                tools_count += server.get("tools_count", 0)
+            total_tools = health.get("total_tools", tools_count)
+
+            st.sidebar.metric("Connected Servers", f"{connected_servers}/{server_count}")
+            st.sidebar.metric("Available Tools", total_tools)
 
     def render_mcp_management_tab(self):
         """Render complete MCP management interface as a tab"""
@@ -112,15 +264,15 @@ class MCPUIManager:
             st.subheader("Server Status")
 
         with col2:
-            if st.button("🔄 Refresh Status", key="mcp_refresh_main"):
-                with st.spinner("Refreshing MCP status..."):
-                    asyncio.run(self.refresh_mcp_status())
-                st.rerun()
-
-        with col3:
             if st.button("⚡ Test Connections", key="mcp_test_connections"):
                 with st.spinner("Testing MCP connections..."):
-                    asyncio.run(self.test_all_connections())
+                    self.test_all_connections()
+
+        with col3:
+            if st.button("♻️ Hard Reset", key="mcp_hard_reset"):
+                with st.spinner("Reconnecting MCP servers..."):
+                    self.reset_mcp_connections()
+                st.rerun()
 
         # Configuration section
         st.markdown("---")
@@ -144,7 +296,7 @@ class MCPUIManager:
 
         # Load current configuration
         try:
-            config = MCPConfig("mcp_config.json")
+            config = _load_mcp_config()
             servers = config.servers.get("servers", {})
 
             if not servers:
@@ -153,18 +305,19 @@ class MCPUIManager:
 
             # Display each server configuration
             for server_name, server_config in servers.items():
+                get = server_config.get
                 with st.expander(f"🖥️ {server_name.title()} Server", expanded=False):
                     col1, col2 = st.columns([3, 1])
 
                     with col1:
-                        st.markdown(f"**Description:** {server_config.get('description', 'No description')}")
-                        st.markdown(f"**Command:** `{server_config.get('command', 'N/A')}`")
+                        st.markdown(f"**Description:** {get('description', 'No description')}")
+                        st.markdown(f"**Command:** `{get('command', 'N/A')}`")
 
-                        args = server_config.get('args', [])
+                        args = get('args', ())
                         if args:
                             st.markdown(f"**Arguments:** `{' '.join(args)}`")
 
-                        capabilities = server_config.get('capabilities', [])
+                        capabilities = get('capabilities', ())
                         if capabilities:
                             st.markdown("**Capabilities:**")
                             for cap in capabilities:
@@ -172,7 +325,7 @@ class MCPUIManager:
 
                     with col2:
                         # Enable/disable toggle
-                        current_enabled = server_config.get('enabled', False)
+                        current_enabled = get('enabled', False)
                         enabled = st.checkbox(
                             "Enabled",
                             value=current_enabled,
@@ -186,20 +339,30 @@ class MCPUIManager:
                             else:
                                 config.disable_server(server_name)
                                 st.info(f"ℹ️ {server_name} disabled")
+                            _load_mcp_config_at.clear()
                             st.rerun()
 
         except Exception as e:
             st.error(f"Error loading server configuration: {str(e)}")
 
+    @st.fragment(run_every=None)
     def _render_connection_status(self):
-        """Render connection status section"""
-        st.subheader("🔌 Connection Status")
+        """Render connection status section (reruns on its own when refreshed)"""
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            st.subheader("🔌 Connection Status")
+
+        with col2:
+            # Refreshing before reading the status means no rerun is needed
+            if st.button("🔄 Refresh Status", key="mcp_refresh_main"):
+                with st.spinner("Refreshing MCP status..."):
+                    self.refresh_mcp_status()
 
-        if not st.session_state.mcp_health_status:
+        health = st.session_state.mcp_health_status or {}
+        if not health:
             st.info("Click 'Refresh Status' to check MCP server connections")
             return
-
-        health = st.session_state.mcp_health_status
         servers = health.get("servers", {})
 
         if not servers:
@@ -208,14 +371,7 @@ class MCPUIManager:
 
         # Overall status
         overall_status = health.get("overall_status", "unknown")
-        status_colors = {
-            "healthy": "🟢",
-            "degraded": "🟡",
-            "unhealthy": "🔴",
-            "unknown": "⚪"
-        }
-
-        st.markdown(f"**Overall Status:** {status_colors.get(overall_status, '⚪')} {overall_status.title()}")
+        st.markdown(f"**Overall Status:** {_STATUS_COLORS.get(overall_status, '⚪')} {overall_status.title()}")
 
         # Individual server status
         for server_name, server_info in servers.items():
@@ -247,31 +403,30 @@ class MCPUIManager:
                 st.markdown(f"• {error}")
 
         # Last updated
-        if st.session_state.mcp_last_refresh:
-            st.caption(f"Last updated: {st.session_state.mcp_last_refresh}")
+        last_refresh_ts = st.session_state.mcp_last_refresh_ts
+        if last_refresh_ts:
+            st.caption(f"Last updated: {_format_refresh_time(last_refresh_ts)}")
 
+    @st.fragment(run_every=None)
     def _render_tools_section(self):
         """Render available tools section"""
         st.subheader("🔧 Available Tools")
 
-        if not st.session_state.mcp_available_tools:
+        available_tools = st.session_state.mcp_available_tools or {}
+        if not available_tools:
             st.info("No tools information available. Refresh status to load tools.")
             return
 
-        tools = st.session_state.mcp_available_tools
+        tools = _flatten_tools(str(st.session_state.mcp_last_refresh_ts), available_tools)
 
         for server_name, server_tools in tools.items():
             if server_tools:
                 with st.expander(f"🖥️ {server_name.title()} Tools ({len(server_tools)} available)"):
-                    for tool in server_tools:
-                        tool_name = getattr(tool, 'name', 'Unknown Tool')
-                        tool_desc = getattr(tool, 'description', 'No description available')
-
-                        col1, col2 = st.columns([1, 3])
-                        with col1:
-                            st.markdown(f"**{tool_name}**")
-                        with col2:
-                            st.markdown(tool_desc)
+                    st.dataframe(
+                        pd.DataFrame(server_tools, columns=["Tool", "Description"]),
+                        use_container_width=True,
+                        hide_index=True
+                    )
 
     def _render_advanced_settings(self):
         """Render advanced MCP settings"""
@@ -309,18 +464,15 @@ class MCPUIManager:
             col1, col2 = st.columns(2)
 
             with col1:
-                if st.button("📤 Export Config"):
-                    try:
-                        config = MCPConfig("mcp_config.json")
-                        config_json = json.dumps(config.servers, indent=2)
-                        st.download_button(
-                            label="Download mcp_config.json",
-                            data=config_json,
-                            file_name="mcp_config.json",
-                            mime="application/json"
-                        )
-                    except Exception as e:
-                        st.error(f"Error exporting config: {str(e)}")
+                try:
+                    st.download_button(
+                        label="📤 Export Config",
+                        data=_config_bytes("mcp_config.json", os.path.getmtime("mcp_config.json")),
+                        file_name="mcp_config.json",
+                        mime="application/json"
+                    )
+                except Exception as e:
+                    st.error(f"Error exporting config: {str(e)}")
 
             with col2:
                 uploaded_config = st.file_uploader(
@@ -331,36 +483,34 @@ class MCPUIManager:
 
                 if uploaded_config is not None:
                     try:
-                        config_data = json.load(uploaded_config)
-                        # Validate and save configuration
-                        st.success("Configuration imported successfully!")
+                        config_data = _parse_uploaded_config(uploaded_config.getvalue())
+                        if not isinstance(config_data, dict) or not isinstance(config_data.get("servers"), dict):
+                            st.error("Invalid configuration: expected a 'servers' mapping")
+                        elif st.button("✅ Apply Config", key="mcp_apply_config"):
+                            _load_mcp_config().save_config(config_data)
+                            _load_mcp_config_at.clear()
+                            st.success("Configuration imported successfully!")
                     except Exception as e:
                         st.error(f"Error importing config: {str(e)}")
 
-    async def refresh_mcp_status(self):
+    def refresh_mcp_status(self):
         """Refresh MCP connection status and available tools"""
         try:
-            # Initialize MCP client
-            client = MCPClientManager("mcp_config.json")
-            proxy = MCPToolProxy(client)
-
-            # Initialize connections
-            await proxy.initialize()
+            client, proxy = _get_mcp_proxy()
+            health_status, available_tools = _run_async(_fetch_mcp_status(client, proxy))
 
-            # Get health status
-            health_status = await proxy.health_check()
+            # Session state is only written here, on the script thread
             st.session_state.mcp_health_status = health_status
-
-            # Get connection status
-            connection_status = client.get_connection_status()
-            st.session_state.mcp_connection_status = connection_status
-
-            # Get available tools
-            available_tools = await client.list_all_tools()
             st.session_state.mcp_available_tools = available_tools
 
+            # Connection status is already part of the health snapshot
+            st.session_state.mcp_connection_status = {
+                name: info.get("connected", False)
+                for name, info in health_status.get("servers", {}).items()
+            }
+
             # Update last refresh time
-            st.session_state.mcp_last_refresh = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state.mcp_last_refresh_ts = time.time()
 
             # Store client instances
             st.session_state.mcp_client = client
@@ -372,23 +522,32 @@ class MCPUIManager:
             logger.error(f"Error refreshing MCP status: {e}")
             st.error(f"Failed to refresh MCP status: {str(e)}")
 
-    async def test_all_connections(self):
+    def reset_mcp_connections(self):
+        """Disconnect the persistent MCP client and rebuild it from scratch"""
+        _reset_mcp_proxy()
+        st.session_state.mcp_client = None
+        st.session_state.mcp_proxy = None
+        self.refresh_mcp_status()
+
+    def test_all_connections(self, force: bool = False):
         """Test all MCP server connections"""
         try:
-            if not st.session_state.mcp_proxy:
-                await self.refresh_mcp_status()
+            if not st.session_state.get('mcp_proxy'):
+                self.refresh_mcp_status()
 
-            proxy = st.session_state.mcp_proxy
+            proxy = st.session_state.get('mcp_proxy')
             if proxy:
-                # Perform comprehensive health check
-                health = await proxy.health_check()
+                # Collect each server's result in completion order on the loop
+                # thread; rendering happens below on the script thread
+                results: List[Tuple[str, Dict[str, Any]]] = []
 
-                # Show test results
-                st.success("✅ Connection test completed!")
+                async def collect_server_result(server_name: str, server_info: Dict[str, Any]):
+                    results.append((server_name, server_info))
+
+                # Perform comprehensive health check
+                _run_async(_cached_health(proxy, force=force, on_server=collect_server_result))
 
-                # Display detailed results
-                servers = health.get("servers", {})
-                for server_name, server_info in servers.items():
+                for server_name, server_info in results:
                     connected = server_info.get("connected", False)
                     responsive = server_info.get("responsive", False)
 
@@ -399,6 +558,8 @@ class MCPUIManager:
                     else:
                         st.error(f"❌ {server_name}: Connection failed")
 
+                st.success("✅ Connection test completed!")
+
             else:
                 st.error("MCP proxy not available for testing")
 
@@ -410,15 +571,19 @@ class MCPUIManager:
 # CONVENIENCE FUNCTIONS
 # ====================================
 
+def _ui_manager() -> MCPUIManager:
+    """Get the MCP UI manager for this session, creating it on first use"""
+    if 'mcp_ui_manager' not in st.session_state:
+        st.session_state.mcp_ui_manager = MCPUIManager()
+    return st.session_state.mcp_ui_manager
+
 def render_mcp_sidebar():
     """Convenience function to render MCP sidebar"""
-    ui_manager = MCPUIManager()
-    ui_manager.render_mcp_sidebar()
+    _ui_manager().render_mcp_sidebar()
 
 def render_mcp_management_tab():
     """Convenience function to render MCP management tab"""
-    ui_manager = MCPUIManager()
-    ui_manager.render_mcp_management_tab()
+    _ui_manager().render_mcp_management_tab()
 
 def get_mcp_enhanced_workflow():
     """Get MCP enhanced workflow v2 with current settings"""
@@ -436,5 +601,5 @@ def get_mcp_status():
         "health": st.session_state.get('mcp_health_status', {}),
         "connections": st.session_state.get('mcp_connection_status', {}),
         "tools": st.session_state.get('mcp_available_tools', {}),
-        "last_refresh": st.session_state.get('mcp_last_refresh', None)
+        "last_refresh": _format_refresh_time(st.session_state.get('mcp_last_refresh_ts'))
     }
\ No newline at end of file
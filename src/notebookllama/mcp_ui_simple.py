@@ -6,7 +6,9 @@ Designed to work within Enhanced_Home.py without creating nested tabs
 import streamlit as st
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -20,17 +22,127 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+_VIEWS = ("Dashboard", "Servers", "Tools", "Settings")
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+_LOG_LEVEL_INDEX = {level: i for i, level in enumerate(_LOG_LEVELS)}
+
+# Tool documentation shown by the Tools view
+_TOOL_DOCS: Dict[str, str] = {
+    "read_file": "Reads the contents of a file from the filesystem.",
+    "write_file": "Writes content to a file in the filesystem.",
+    "list_directory": "Lists the contents of a directory.",
+    "create_entities": "Creates entities in the knowledge graph.",
+    "search_entities": "Searches for entities in the knowledge graph.",
+    "create_relations": "Creates relationships between entities."
+}
+
+@st.cache_data(show_spinner=False)
+def _load_mcp_config_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Load MCP configuration JSON, cached until the file's mtime changes"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _clean_lines(text: str) -> List[str]:
+    """Split multi-line form input into stripped, non-empty lines"""
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+def _validate_config(config: Any) -> None:
+    """Check the structure of an MCP config, raising ValueError on a mismatch"""
+    if not isinstance(config, dict):
+        raise ValueError("Configuration must be a JSON object")
+
+    unknown_keys = set(config) - {"servers", "global_settings"}
+    if unknown_keys:
+        raise ValueError(f"Unknown top-level keys: {', '.join(sorted(unknown_keys))}")
+
+    servers = config.get("servers", {})
+    if not isinstance(servers, dict):
+        raise ValueError("'servers' must be an object mapping names to server configs")
+
+    for name, server in servers.items():
+        if not isinstance(server, dict) or not isinstance(server.get("command"), str):
+            raise ValueError(f"Server '{name}' must have a 'command' string")
+
+    if not isinstance(config.get("global_settings", {}), dict):
+        raise ValueError("'global_settings' must be an object")
+
+
+def _servers_fingerprint(servers: Dict[str, Any]) -> int:
+    """Cheap fingerprint of the parts of the server config the views derive from"""
+    return hash(tuple(
+        (
+            name,
+            server.get("enabled"),
+            tuple(server.get("capabilities", [])),
+            server.get("description"),
+            server.get("command"),
+        )
+        for name, server in sorted(servers.items())
+    ))
+
+
+def _get_tools_index(servers: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each tool to the enabled servers providing it, rebuilt only on config change"""
+    fp = _servers_fingerprint(servers)
+    if st.session_state.get('_tools_index_fp') == fp:
+        return st.session_state._tools_index
+
+    all_tools: Dict[str, List[str]] = {}
+    for server_name, server in servers.items():
+        if server.get("enabled", False):
+            for tool in server.get("capabilities", []):
+                all_tools.setdefault(tool, []).append(server_name)
+
+    st.session_state._tools_index_fp = fp
+    st.session_state._tools_index = all_tools
+    return all_tools
+
+
+
+def _get_dashboard_rows(servers: Dict[str, Any]) -> Tuple[Tuple[int, int], List[Tuple[str, ...]]]:
+    """Dashboard totals and pre-formatted server card labels, rebuilt only on config change"""
+    fp = _servers_fingerprint(servers)
+    if st.session_state.get('_dashboard_fp') == fp:
+        return st.session_state._dashboard_totals, st.session_state._dashboard_rows
+
+    enabled_servers = 0
+    total_tools = 0
+    rows = []
+    for server_name, server_config in servers.items():
+        capabilities = server_config.get("capabilities") or ()
+        enabled = server_config.get("enabled", False)
+        enabled_servers += enabled
+        total_tools += len(capabilities)
+        status_icon = "🟢" if enabled else "🔴"
+        rows.append((
+            server_name,
+            f"**{status_icon} {server_name.title()}**",
+            server_config.get("description", "No description"),
+            f"🔧 {len(capabilities)} tools",
+            f"Command: `{server_config.get('command', '')}`",
+        ))
+
+    st.session_state._dashboard_fp = fp
+    st.session_state._dashboard_totals = (enabled_servers, total_tools)
+    st.session_state._dashboard_rows = rows
+    return (enabled_servers, total_tools), rows
+
 
 class SimpleMCPUI:
     """Simple MCP UI for tab integration"""
 
     def __init__(self):
         self.config_path = "mcp_config.json"
+        self._pending_writes = False
         self._initialize_session_state()
-        self._load_config()
 
     def _initialize_session_state(self):
-        """Initialize session state variables"""
+        """Initialize session state variables and load config, once per session"""
+        if '_mcp_ui_bootstrapped' in st.session_state:
+            return
+
         defaults = {
             'mcp_config': None,
             'mcp_enabled': True,
@@ -43,11 +155,17 @@ class SimpleMCPUI:
             if key not in st.session_state:
                 st.session_state[key] = value
 
+        self._load_config()
+        st.session_state._mcp_ui_bootstrapped = True
+
     def _load_config(self):
         """Load MCP configuration"""
+        if st.session_state.get('mcp_config') is not None:
+            return
+
         try:
-            with open(self.config_path, 'r') as f:
-                st.session_state.mcp_config = json.load(f)
+            mtime = Path(self.config_path).stat().st_mtime
+            st.session_state.mcp_config = _load_mcp_config_cached(self.config_path, mtime)
         except Exception as e:
             logger.error(f"Failed to load MCP config: {e}")
             st.session_state.mcp_config = {"servers": {}, "global_settings": {}}
@@ -58,10 +176,11 @@ class SimpleMCPUI:
 
         # Quick controls at the top
         col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        mcp_enabled = st.session_state.mcp_enabled
 
         with col1:
             st.markdown("**System Status**")
-            if st.session_state.mcp_enabled:
+            if mcp_enabled:
                 st.success("🟢 MCP Enabled")
             else:
                 st.warning("🔴 MCP Disabled")
@@ -73,17 +192,17 @@ class SimpleMCPUI:
         with col3:
             view = st.selectbox(
                 "View",
-                ["Dashboard", "Servers", "Tools", "Settings"],
+                _VIEWS,
                 key="mcp_view_selector"
             )
 
         with col4:
             enabled = st.checkbox(
                 "Enable MCP",
-                value=st.session_state.mcp_enabled,
+                value=mcp_enabled,
                 key="mcp_enable_toggle"
             )
-            if enabled != st.session_state.mcp_enabled:
+            if enabled != mcp_enabled:
                 st.session_state.mcp_enabled = enabled
 
         st.markdown("---")
@@ -98,6 +217,10 @@ class SimpleMCPUI:
         elif view == "Settings":
             self._render_settings()
 
+        # One write and one rerun for all config changes made in this run
+        self._flush_pending()
+
+    @st.fragment
     def _render_dashboard(self):
         """Render dashboard view"""
         st.markdown("### 📊 MCP Dashboard")
@@ -105,19 +228,19 @@ class SimpleMCPUI:
         config = st.session_state.mcp_config
         servers = config.get("servers", {})
 
+        # Pre-formatted metrics and card labels, rebuilt only on config change
+        (enabled_servers, total_tools), rows = _get_dashboard_rows(servers)
+
         # Metrics
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            total_servers = len(servers)
-            st.metric("Total Servers", total_servers)
+            st.metric("Total Servers", len(servers))
 
         with col2:
-            enabled_servers = sum(1 for s in servers.values() if s.get("enabled", False))
             st.metric("Enabled Servers", enabled_servers)
 
         with col3:
-            total_tools = sum(len(s.get("capabilities", [])) for s in servers.values())
             st.metric("Available Tools", total_tools)
 
         # Server status cards
@@ -127,32 +250,30 @@ class SimpleMCPUI:
             st.info("No MCP servers configured. Add servers in Settings to get started.")
             return
 
-        for server_name, server_config in servers.items():
+        for server_name, title_label, description, tools_label, command_label in rows:
             with st.container():
                 col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
 
                 with col1:
-                    enabled = server_config.get("enabled", False)
-                    status_icon = "🟢" if enabled else "🔴"
-                    st.markdown(f"**{status_icon} {server_name.title()}**")
-                    st.caption(server_config.get("description", "No description"))
+                    st.markdown(title_label)
+                    st.caption(description)
 
                 with col2:
-                    tools = server_config.get("capabilities", [])
-                    st.markdown(f"🔧 {len(tools)} tools")
+                    st.markdown(tools_label)
 
                 with col3:
-                    command = server_config.get("command", "")
-                    st.caption(f"Command: `{command}`")
+                    st.caption(command_label)
 
                 with col4:
                     if st.button("Test", key=f"test_{server_name}"):
                         self._test_server(server_name)
 
         # Show last refresh
-        if st.session_state.mcp_last_refresh:
-            st.caption(f"Last refreshed: {st.session_state.mcp_last_refresh}")
+        last_refresh = st.session_state.mcp_last_refresh
+        if last_refresh:
+            st.caption(f"Last refreshed: {datetime.fromtimestamp(last_refresh).strftime('%Y-%m-%d %H:%M:%S')}")
 
+    @st.fragment
     def _render_servers(self):
         """Render servers view"""
         st.markdown("### 🖥️ Server Management")
@@ -163,17 +284,23 @@ class SimpleMCPUI:
         if not servers:
             st.info("No servers configured.")
 
-            # Quick add buttons
+            # Quick add - selected servers are added with a single config write
             st.markdown("**Quick Add:**")
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
 
             with col1:
-                if st.button("📁 Add Filesystem Server"):
-                    self._add_filesystem_server()
+                add_filesystem = st.checkbox("📁 Filesystem Server", key="quick_add_filesystem")
 
             with col2:
-                if st.button("🧠 Add Memory Server"):
-                    self._add_memory_server()
+                add_memory = st.checkbox("🧠 Memory Server", key="quick_add_memory")
+
+            with col3:
+                if st.button("➕ Add Selected", disabled=not (add_filesystem or add_memory)):
+                    if add_filesystem:
+                        self._add_filesystem_server()
+                    if add_memory:
+                        self._add_memory_server()
+                    self._flush_pending()
             return
 
         # Server list
@@ -209,7 +336,16 @@ class SimpleMCPUI:
                     if st.button("🗑️ Remove", key=f"remove_{server_name}"):
                         if st.checkbox("Confirm deletion", key=f"confirm_del_{server_name}"):
                             self._remove_server(server_name)
+                            self._flush_pending()
 
+        # Toggles accumulate in session state and are written in one go on Save
+        if st.session_state.get('_mcp_dirty'):
+            st.caption("Unsaved server changes")
+            if st.button("💾 Save Changes", key="save_server_toggles"):
+                self._flush_if_dirty()
+                st.success("Changes saved!")
+
+    @st.fragment
     def _render_tools(self):
         """Render tools view"""
         st.markdown("### 🔧 Available Tools")
@@ -217,14 +353,8 @@ class SimpleMCPUI:
         config = st.session_state.mcp_config
         servers = config.get("servers", {})
 
-        # Collect all tools
-        all_tools = {}
-        for server_name, server in servers.items():
-            if server.get("enabled", False):
-                for tool in server.get("capabilities", []):
-                    if tool not in all_tools:
-                        all_tools[tool] = []
-                    all_tools[tool].append(server_name)
+        # Tool -> servers index, cached until the server config changes
+        all_tools = _get_tools_index(servers)
 
         if not all_tools:
             st.warning("No tools available. Enable some servers first.")
@@ -245,6 +375,7 @@ class SimpleMCPUI:
                     if st.button("📖 Info", key=f"info_{tool_name}"):
                         self._show_tool_info(tool_name)
 
+    @st.fragment
     def _render_settings(self):
         """Render settings view"""
         st.markdown("### ⚙️ MCP Settings")
@@ -268,8 +399,8 @@ class SimpleMCPUI:
                     if server_name and command:
                         self._add_custom_server(
                             server_name, command, description,
-                            args.split('\n') if args else [],
-                            capabilities.split('\n') if capabilities else [],
+                            _clean_lines(args),
+                            _clean_lines(capabilities),
                             enabled
                         )
                     else:
@@ -292,8 +423,8 @@ class SimpleMCPUI:
         with col2:
             log_level = st.selectbox(
                 "Log Level",
-                ["DEBUG", "INFO", "WARNING", "ERROR"],
-                index=["DEBUG", "INFO", "WARNING", "ERROR"].index(settings.get("log_level", "INFO"))
+                _LOG_LEVELS,
+                index=_LOG_LEVEL_INDEX.get(settings.get("log_level", "INFO"), 1)
             )
 
         if st.button("💾 Save Global Settings"):
@@ -305,30 +436,37 @@ class SimpleMCPUI:
 
         with col1:
             if st.button("📤 Export Config"):
-                config_json = json.dumps(config, indent=2)
+                self._flush_if_dirty()
+                # Compact UTF-8 bytes: no indentation, no re-encoding by Streamlit
+                config_bytes = json.dumps(config, separators=(",", ":")).encode("utf-8")
                 st.download_button(
                     "💾 Download mcp_config.json",
-                    data=config_json,
+                    data=config_bytes,
                     file_name="mcp_config.json",
                     mime="application/json"
                 )
 
         with col2:
             uploaded = st.file_uploader("📥 Import Config", type="json")
-            if uploaded:
+            # The uploader keeps the file across reruns; apply each upload only once
+            if uploaded and uploaded.file_id != st.session_state.get('_mcp_imported_file_id'):
+                st.session_state._mcp_imported_file_id = uploaded.file_id
                 try:
                     new_config = json.load(uploaded)
+                    _validate_config(new_config)
                     st.session_state.mcp_config = new_config
-                    self._save_config()
+                    self._defer_save()
                     st.success("✅ Configuration imported!")
-                    st.rerun()
                 except Exception as e:
                     st.error(f"Import failed: {e}")
 
+        # Structural changes need a full app rerun, not just this fragment
+        self._flush_pending()
+
     # Helper methods
     def _refresh_servers(self):
         """Refresh server status"""
-        st.session_state.mcp_last_refresh = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.session_state.mcp_last_refresh = time.time()
         st.success("Servers refreshed!")
 
     def _test_server(self, server_name: str):
@@ -347,7 +485,7 @@ class SimpleMCPUI:
         config = st.session_state.mcp_config
         if server_name in config["servers"]:
             config["servers"][server_name]["enabled"] = enabled
-            self._save_config()
+            st.session_state._mcp_dirty = True
             st.success(f"{'Enabled' if enabled else 'Disabled'} {server_name}")
 
     def _remove_server(self, server_name: str):
@@ -355,9 +493,8 @@ class SimpleMCPUI:
         config = st.session_state.mcp_config
         if server_name in config["servers"]:
             del config["servers"][server_name]
-            self._save_config()
+            self._defer_save()
             st.success(f"Removed {server_name}")
-            st.rerun()
 
     def _add_filesystem_server(self):
         """Add filesystem server quickly"""
@@ -369,9 +506,8 @@ class SimpleMCPUI:
             "description": "File system operations",
             "capabilities": ["read_file", "write_file", "list_directory"]
         }
-        self._save_config()
+        self._defer_save()
         st.success("✅ Added filesystem server!")
-        st.rerun()
 
     def _add_memory_server(self):
         """Add memory server quickly"""
@@ -383,9 +519,8 @@ class SimpleMCPUI:
             "description": "Knowledge graph and memory",
             "capabilities": ["create_entities", "search_entities", "create_relations"]
         }
-        self._save_config()
+        self._defer_save()
         st.success("✅ Added memory server!")
-        st.rerun()
 
     def _add_custom_server(self, name: str, command: str, description: str,
                           args: List[str], capabilities: List[str], enabled: bool):
@@ -393,14 +528,13 @@ class SimpleMCPUI:
         config = st.session_state.mcp_config
         config["servers"][name] = {
             "command": command,
-            "args": [arg.strip() for arg in args if arg.strip()],
+            "args": args,
             "enabled": enabled,
             "description": description,
-            "capabilities": [cap.strip() for cap in capabilities if cap.strip()]
+            "capabilities": capabilities
         }
-        self._save_config()
+        self._defer_save()
         st.success(f"✅ Added server '{name}'!")
-        st.rerun()
 
     def _save_global_settings(self, settings: Dict):
         """Save global settings"""
@@ -409,11 +543,36 @@ class SimpleMCPUI:
         self._save_config()
         st.success("Settings saved!")
 
+    def _flush_pending(self):
+        """Write deferred config changes and rerun the full app to reflect them"""
+        if self._pending_writes:
+            self._pending_writes = False
+            self._save_config()
+            st.rerun()
+
+    def _flush_if_dirty(self):
+        """Write toggled config to disk if there are unsaved toggles"""
+        if st.session_state.get('_mcp_dirty'):
+            self._save_config()
+
+    def _defer_save(self):
+        """Mark the config as changed; it is written once at the end of the render"""
+        self._pending_writes = True
+
     def _save_config(self):
-        """Save configuration to file"""
+        """Save configuration to file atomically, skipping unchanged content"""
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(st.session_state.mcp_config, f, indent=2)
+            config = st.session_state.mcp_config
+            data = json.dumps(config, indent=2).encode()
+            data_hash = hash(data)
+            if data_hash != st.session_state.get('_mcp_config_hash'):
+                tmp_path = self.config_path + ".tmp"
+                Path(tmp_path).write_bytes(data)
+                os.replace(tmp_path, self.config_path)
+                st.session_state._mcp_config_hash = data_hash
+                _load_mcp_config_cached.clear()
+
+            st.session_state._mcp_dirty = False
             return True
         except Exception as e:
             st.error(f"Failed to save config: {e}")
@@ -421,18 +580,7 @@ class SimpleMCPUI:
 
     def _show_tool_info(self, tool_name: str):
         """Show tool information"""
-        # Tool documentation
-        docs = {
-            "read_file": "Reads the contents of a file from the filesystem.",
-            "write_file": "Writes content to a file in the filesystem.",
-            "list_directory": "Lists the contents of a directory.",
-            "create_entities": "Creates entities in the knowledge graph.",
-            "search_entities": "Searches for entities in the knowledge graph.",
-            "create_relations": "Creates relationships between entities."
-        }
-
-        info = docs.get(tool_name, "No documentation available.")
-        st.info(f"**{tool_name}**: {info}")
+        st.info(f"**{tool_name}**: {_TOOL_DOCS.get(tool_name, 'No documentation available.')}")
 
 
 # Convenience function for Enhanced_Home.py
@@ -3,163 +3,201 @@ Mind Map Generator - Creates interactive HTML mind maps from document topics
 Senior-level implementation with proper graph structure and visualization
 """
 
+import html
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from dataclasses import dataclass
-import uuid
-import colorsys
+from functools import lru_cache
+from itertools import chain, islice, repeat
+import numpy as np
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class MindMapNode:
-    """Represents a node in the mind map"""
-    id: str
-    label: str
-    level: int
-    parent_id: Optional[str] = None
-    color: Optional[str] = None
-    size: int = 20
-    children: List[str] = None
-
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
-
-
-class MindMapGenerator:
-    """
-    Generates interactive HTML mind maps using vis.js network
-    Creates hierarchical structures from document topics and content
-    """
-
-    def __init__(self):
-        self.node_colors = self._generate_color_palette()
-
-    def generate_mind_map(
-        self,
-        title: str,
-        topics: List[str],
-        key_points: List[str],
-        additional_data: Optional[Dict[str, Any]] = None
-    ) -> str:
-        """
-        Generate complete HTML mind map
-
-        Args:
-            title: Document title (root node)
-            topics: Main topics (level 1 nodes)
-            key_points: Key points (level 2 nodes)
-            additional_data: Optional metadata for enhanced visualization
-
-        Returns:
-            Complete HTML string with embedded vis.js mind map
-        """
-        try:
-            logger.info(f"Generating mind map for '{title}' with {len(topics)} topics")
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-            # Create hierarchical structure
-            nodes, edges = self._create_graph_structure(title, topics, key_points)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
-            # Generate HTML with embedded JavaScript
-            html_content = self._generate_html(nodes, edges, title)
+logger = logging.getLogger(__name__)
 
-            logger.info("Mind map generated successfully")
-            return html_content
 
-        except Exception as e:
-            logger.error(f"Mind map generation failed: {e}")
-            return self._create_fallback_mind_map(title, topics)
+def _dumps(obj: Any) -> bytes:
+    """Serialize graph data to JSON bytes, using msgspec or orjson when installed"""
+    # Compact output: the payload is only ever parsed by vis.js
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
 
-    def _create_graph_structure(
-        self,
-        title: str,
-        topics: List[str],
-        key_points: List[str]
-    ) -> tuple[List[Dict], List[Dict]]:
-        """Create nodes and edges for the mind map graph"""
 
-        nodes = []
-        edges = []
+def _append_json(buf: bytearray, obj: Any) -> None:
+    """Append one element to a JSON array being built in ``buf``"""
+    if len(buf) > 1:
+        buf += b","
+    buf += _dumps(obj)
 
-        # Root node (document title)
-        root_id = "root"
-        nodes.append({
-            "id": root_id,
-            "label": self._truncate_text(title, 30),
-            "color": {"background": "#4CAF50", "border": "#45a049"},
-            "font": {"size": 16, "color": "white"},
-            "shape": "ellipse",
-            "size": 30,
-            "title": title  # Tooltip
-        })
 
-        # Topic nodes (level 1)
-        topic_ids = []
-        for i, topic in enumerate(topics):
-            if not topic.strip():
-                continue
-
-            topic_id = f"topic_{i}"
-            topic_ids.append(topic_id)
-
-            color = self.node_colors[i % len(self.node_colors)]
-            nodes.append({
-                "id": topic_id,
-                "label": self._truncate_text(topic, 20),
-                "color": {"background": color, "border": self._darken_color(color)},
-                "font": {"size": 14},
-                "shape": "box",
-                "size": 25,
-                "title": topic
-            })
-
-            # Edge from root to topic
-            edges.append({
-                "from": root_id,
-                "to": topic_id,
-                "color": {"color": "#999999"},
-                "width": 2
-            })
-
-        # Key point nodes (level 2) - distribute among topics
-        points_per_topic = max(1, len(key_points) // max(1, len(topic_ids)))
-
-        for i, point in enumerate(key_points):
-            if not point.strip():
-                continue
-
-            point_id = f"point_{i}"
-            topic_index = min(i // points_per_topic, len(topic_ids) - 1)
-            parent_topic = topic_ids[topic_index] if topic_ids else root_id
-
-            color = self._lighten_color(self.node_colors[topic_index % len(self.node_colors)])
-            nodes.append({
-                "id": point_id,
-                "label": self._truncate_text(point, 25),
-                "color": {"background": color, "border": self._darken_color(color)},
-                "font": {"size": 12},
-                "shape": "circle",
-                "size": 20,
-                "title": point
-            })
-
-            # Edge from topic to key point
-            edges.append({
-                "from": parent_topic,
-                "to": point_id,
-                "color": {"color": "#cccccc"},
-                "width": 1
-            })
-
-        return nodes, edges
-
-    def _generate_html(self, nodes: List[Dict], edges: List[Dict], title: str) -> str:
-        """Generate complete HTML with vis.js mind map"""
-
-        return f"""
+def _extend_json(buf: bytearray, items: List[Any]) -> None:
+    """Append several elements to a JSON array being built in ``buf``"""
+    if not items:
+        return
+    if len(buf) > 1:
+        buf += b","
+    # Encode the batch in one call and splice it in without its brackets
+    buf += _dumps(items)[1:-1]
+
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_hex_color(hex_color: str) -> bool:
+    """Check for a ``#rrggbb`` color string"""
+    return len(hex_color) == 7 and hex_color[0] == "#" and _HEX_DIGITS.issuperset(hex_color[1:])
+
+
+def _lighten_color(hex_color: str, factor: float = 0.3) -> str:
+    """Lighten a hex color"""
+    if not _is_hex_color(hex_color):
+        return "#e0e0e0"  # Fallback light gray
+
+    # Parse all three channels with a single int() and unpack by shifting
+    v = int(hex_color[1:], 16)
+    r, g, b = (v >> 16) & 0xff, (v >> 8) & 0xff, v & 0xff
+
+    lr = min(255, int(r + (255 - r) * factor))
+    lg = min(255, int(g + (255 - g) * factor))
+    lb = min(255, int(b + (255 - b) * factor))
+    return f"#{(lr << 16) | (lg << 8) | lb:06x}"
+
+
+def _darken_color(hex_color: str, factor: float = 0.2) -> str:
+    """Darken a hex color"""
+    if not _is_hex_color(hex_color):
+        return "#666666"  # Fallback dark gray
+
+    v = int(hex_color[1:], 16)
+    r, g, b = (v >> 16) & 0xff, (v >> 8) & 0xff, v & 0xff
+
+    keep = 1 - factor
+    return f"#{(int(r * keep) << 16) | (int(g * keep) << 8) | int(b * keep):06x}"
+
+
+@lru_cache(maxsize=4096)
+def _truncate_text(text: str, max_length: int) -> str:
+    """Truncate text for display in nodes"""
+    if len(text) <= max_length:
+        return text
+
+    # Try to break at word boundary
+    if ' ' in text[:max_length]:
+        truncated = text[:max_length].rsplit(' ', 1)[0]
+    else:
+        truncated = text[:max_length-3]
+
+    return truncated + "..."
+
+
+def _build_palette(num_colors: int = 12, lightness: float = 0.6, saturation: float = 0.7) -> tuple:
+    """Generate a visually appealing color palette"""
+    # Closed-form HLS -> RGB (as in colorsys) evaluated for all hues at once
+    hues = np.arange(num_colors) / num_colors
+    if lightness <= 0.5:
+        m2 = lightness * (1.0 + saturation)
+    else:
+        m2 = lightness + saturation - (lightness * saturation)
+    m1 = 2.0 * lightness - m2
+
+    # Channel hues for r, g, b in rows
+    h = np.stack([hues + 1.0 / 3.0, hues, hues - 1.0 / 3.0]) % 1.0
+    channels = np.select(
+        [h < 1.0 / 6.0, h < 0.5, h < 2.0 / 3.0],
+        [m1 + (m2 - m1) * h * 6.0, m2, m1 + (m2 - m1) * (2.0 / 3.0 - h) * 6.0],
+        default=m1,
+    )
+    r, g, b = (np.clip(channels, 0.0, 1.0) * 255).astype(np.int64)
+    packed = (r << 16) | (g << 8) | b
+    return tuple(f"#{v:06x}" for v in packed.tolist())
+
+
+# Palette and its derived variants are computed once at import and indexed
+# in the graph-build loop instead of doing color math per node
+_PALETTE = _build_palette()
+_PALETTE_DARK = tuple(_darken_color(c) for c in _PALETTE)
+_PALETTE_LIGHT = tuple(_lighten_color(c) for c in _PALETTE)
+_PALETTE_LIGHT_DARK = tuple(_darken_color(c) for c in _PALETTE_LIGHT)
+
+
+# Fixed-shape records for graph nodes and edges; msgspec encodes these
+# without building a dict per element
+if msgspec is not None:
+    class NodeRec(msgspec.Struct, omit_defaults=True):
+        """vis.js node record"""
+        id: str
+        label: str
+        color: Dict[str, str]
+        font: Dict[str, Any]
+        shape: str
+        size: int
+        title: Optional[str] = None
+
+    class EdgeRec(msgspec.Struct, rename={"from_": "from"}):
+        """vis.js edge record"""
+        from_: str
+        to: str
+        color: Dict[str, str]
+        width: int
+else:
+    def NodeRec(
+        id: str,
+        label: str,
+        color: Dict[str, str],
+        font: Dict[str, Any],
+        shape: str,
+        size: int,
+        title: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """vis.js node record"""
+        node = {"id": id, "label": label, "color": color, "font": font, "shape": shape, "size": size}
+        if title is not None:
+            node["title"] = title
+        return node
+
+    def EdgeRec(from_: str, to: str, color: Dict[str, str], width: int) -> Dict[str, Any]:
+        """vis.js edge record"""
+        return {"from": from_, "to": to, "color": color, "width": width}
+
+
+def _make_point_node(point_id: str, point: str, topic_index: int) -> "NodeRec":
+    """Build the node for one key point, colored after its parent topic"""
+    k = topic_index % len(_PALETTE_LIGHT)
+    return NodeRec(
+        id=point_id,
+        label=_truncate_text(point, 25),
+        color={"background": _PALETTE_LIGHT[k], "border": _PALETTE_LIGHT_DARK[k]},
+        font={"size": 12},
+        shape="circle",
+        size=20,
+        title=point
+    )
+
+
+def _make_point_edge(parent_id: str, point_id: str) -> "EdgeRec":
+    """Build the edge from a topic (or the root) to one key point"""
+    return EdgeRec(
+        from_=parent_id,
+        to=point_id,
+        color={"color": "#cccccc"},
+        width=1
+    )
+
+
+# Static page shell; literal braces in the CSS/JS are doubled for format_map
+_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -233,10 +271,13 @@ class MindMapGenerator:
         💡 Click and drag nodes • Scroll to zoom • Hover for details
     </div>
 
+    <script id="nodes-data" type="application/json">{nodes_json}</script>
+    <script id="edges-data" type="application/json">{edges_json}</script>
+
     <script type="text/javascript">
-        // Network data
-        var nodes = new vis.DataSet({json.dumps(nodes, indent=2)});
-        var edges = new vis.DataSet({json.dumps(edges, indent=2)});
+        // Network data (parsed from the JSON blocks above)
+        var nodes = new vis.DataSet(JSON.parse(document.getElementById('nodes-data').textContent));
+        var edges = new vis.DataSet(JSON.parse(document.getElementById('edges-data').textContent));
         var data = {{
             nodes: nodes,
             edges: edges
@@ -354,75 +395,217 @@ class MindMapGenerator:
 </body>
 </html>"""
 
-    def _generate_color_palette(self) -> List[str]:
-        """Generate a visually appealing color palette"""
-        colors = []
-        num_colors = 12
-
-        for i in range(num_colors):
-            hue = i / num_colors
-            saturation = 0.7
-            lightness = 0.6
-            rgb = colorsys.hls_to_rgb(hue, lightness, saturation)
-            hex_color = '#{:02x}{:02x}{:02x}'.format(
-                int(rgb[0] * 255),
-                int(rgb[1] * 255),
-                int(rgb[2] * 255)
-            )
-            colors.append(hex_color)
-
-        return colors
-
-    def _lighten_color(self, hex_color: str, factor: float = 0.3) -> str:
-        """Lighten a hex color"""
-        try:
-            # Remove # if present
-            hex_color = hex_color.lstrip('#')
+# Lightweight page for documents with no topics or key points yet; skips
+# vis.js and the graph build entirely
+_EMPTY_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Mind Map: {title}</title>
+</head>
+<body style="font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5;">
+    <div style="text-align: center; color: #333;">
+        <h2>📊 Mind Map: {title}</h2>
+        <p style="color: #666; font-size: 14px;">No topics or key points were extracted for this document.</p>
+    </div>
+</body>
+</html>"""
 
-            # Convert to RGB
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+# The shell is rendered once at import and split into static byte chunks
+# around the title and JSON payloads, so each page only copies the
+# dynamic parts
+_PRE, _MID1, _MID2, _MID3, _POST = (
+    part.encode()
+    for part in _HTML_TEMPLATE.format_map(
+        {"title": "\0", "nodes_json": "\0", "edges_json": "\0"}
+    ).split("\0")
+)
 
-            # Lighten
-            lightened = tuple(
-                min(255, int(c + (255 - c) * factor)) for c in rgb
-            )
 
-            # Convert back to hex
-            return '#{:02x}{:02x}{:02x}'.format(*lightened)
+@dataclass(slots=True)
+class MindMapNode:
+    """Represents a node in the mind map"""
+    id: str
+    label: str
+    level: int
+    parent_id: Optional[str] = None
+    color: Optional[str] = None
+    size: int = 20
+    children: tuple[str, ...] = ()
 
-        except:
-            return "#e0e0e0"  # Fallback light gray
 
-    def _darken_color(self, hex_color: str, factor: float = 0.2) -> str:
-        """Darken a hex color"""
+class MindMapGenerator:
+    """
+    Generates interactive HTML mind maps using vis.js network
+    Creates hierarchical structures from document topics and content
+    """
+
+    def generate_mind_map(
+        self,
+        title: str,
+        topics: List[str],
+        key_points: List[str],
+        additional_data: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Generate complete HTML mind map
+
+        Args:
+            title: Document title (root node)
+            topics: Main topics (level 1 nodes)
+            key_points: Key points (level 2 nodes)
+            additional_data: Optional metadata for enhanced visualization
+
+        Returns:
+            Complete HTML string with embedded vis.js mind map
+        """
         try:
-            # Remove # if present
-            hex_color = hex_color.lstrip('#')
+            logger.info(f"Generating mind map for '{title}' with {len(topics)} topics")
 
-            # Convert to RGB
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+            html_content = b"".join(self.iter_mind_map_chunks(title, topics, key_points)).decode()
 
-            # Darken
-            darkened = tuple(int(c * (1 - factor)) for c in rgb)
+            logger.info("Mind map generated successfully")
+            return html_content
 
-            # Convert back to hex
-            return '#{:02x}{:02x}{:02x}'.format(*darkened)
+        except Exception as e:
+            logger.error(f"Mind map generation failed: {e}")
+            return self._create_fallback_mind_map(title, topics)
+
+    def iter_mind_map_chunks(
+        self,
+        title: str,
+        topics: List[str],
+        key_points: List[str]
+    ) -> Iterator[bytes]:
+        """
+        Generate the HTML mind map as a sequence of byte chunks
+
+        Lets web responses stream the page instead of holding the whole
+        document in memory; joining the chunks gives the same page as
+        ``generate_mind_map``.
+
+        Args:
+            title: Document title (root node)
+            topics: Main topics (level 1 nodes)
+            key_points: Key points (level 2 nodes)
+
+        Yields:
+            UTF-8 encoded HTML fragments
+        """
+        # Drop blank entries once up front; the graph builder assumes clean input
+        topics = [t for t in topics if t.strip()]
+        key_points = [p for p in key_points if p.strip()]
+
+        if not topics and not key_points:
+            logger.info(f"No topics or key points for '{title}', returning empty mind map")
+            yield _EMPTY_TEMPLATE.format(title=html.escape(title)).encode()
+            return
+
+        # Create hierarchical structure
+        nodes, edges = self._emit_graph_structure(title, topics, key_points)
 
-        except:
-            return "#666666"  # Fallback dark gray
+        # Stream the static shell around the title and graph data
+        yield from self._iter_html(nodes, edges, title)
 
-    def _truncate_text(self, text: str, max_length: int) -> str:
-        """Truncate text for display in nodes"""
-        if len(text) <= max_length:
-            return text
+    def _emit_graph_structure(
+        self,
+        title: str,
+        topics: List[str],
+        key_points: List[str]
+    ) -> tuple[bytes, bytes]:
+        """Create nodes and edges for the mind map graph as JSON array bytes
+
+        Expects ``topics`` and ``key_points`` already filtered of blank entries.
+        """
+
+        # Nodes and edges are serialized straight into byte buffers rather
+        # than kept as dict lists and encoded afterwards
+        nodes = bytearray(b"[")
+        edges = bytearray(b"[")
+
+        # Module-level helpers bound to locals for the build loops
+        append = _append_json
+        truncate = _truncate_text
+        palette, palette_dark = _PALETTE, _PALETTE_DARK
+        ncolors = len(palette)
+
+        # Root node (document title)
+        root_id = "root"
+        append(nodes, NodeRec(
+            id=root_id,
+            label=truncate(title, 30),
+            color={"background": "#4CAF50", "border": "#45a049"},
+            font={"size": 16, "color": "white"},
+            shape="ellipse",
+            size=30,
+            title=title  # Tooltip
+        ))
 
-        # Try to break at word boundary
-        if ' ' in text[:max_length]:
-            truncated = text[:max_length].rsplit(' ', 1)[0]
-        else:
-            truncated = text[:max_length-3]
+        # Topic nodes (level 1)
+        topic_ids = []
+        add_topic = topic_ids.append
+        for i, topic in enumerate(topics):
+            topic_id = f"topic_{i}"
+            add_topic(topic_id)
+
+            append(nodes, NodeRec(
+                id=topic_id,
+                label=truncate(topic, 20),
+                color={"background": palette[i % ncolors], "border": palette_dark[i % ncolors]},
+                font={"size": 14},
+                shape="box",
+                size=25,
+                title=topic
+            ))
+
+            # Edge from root to topic
+            append(edges, EdgeRec(
+                from_=root_id,
+                to=topic_id,
+                color={"color": "#999999"},
+                width=2
+            ))
 
-        return truncated + "..."
+        # Key point nodes (level 2) - distribute among topics
+        num_points = len(key_points)
+        points_per_topic = max(1, num_points // max(1, len(topic_ids)))
+
+        # Equivalent to min(i // points_per_topic, last) for each point
+        last = len(topic_ids) - 1
+        topic_indices = list(islice(chain(
+            chain.from_iterable(repeat(t, points_per_topic) for t in range(last)),
+            repeat(last)
+        ), num_points))
+
+        # Each record is a handful of small dicts, so a process pool would
+        # spend more on pickling than it saves; the builders run through map()
+        # and each batch is encoded with a single encoder call instead
+        point_ids = [f"point_{i}" for i in range(num_points)]
+        parents = [topic_ids[t] for t in topic_indices] if topic_ids else repeat(root_id)
+        _extend_json(nodes, list(map(_make_point_node, point_ids, key_points, topic_indices)))
+        _extend_json(edges, list(map(_make_point_edge, parents, point_ids)))
+
+        nodes += b"]"
+        edges += b"]"
+        return bytes(nodes), bytes(edges)
+
+    def _iter_html(self, nodes_json: bytes, edges_json: bytes, title: str) -> Iterator[bytes]:
+        """Yield complete HTML with vis.js mind map in chunks"""
+        # Escaped once for both HTML occurrences; node tooltips keep the raw
+        # title since the JSON encoder handles their escaping
+        title_bytes = html.escape(title).encode()
+
+        yield _PRE
+        yield title_bytes
+        yield _MID1
+        yield title_bytes
+        yield _MID2
+        # "<" only occurs inside JSON strings, so escaping it keeps a
+        # "</script>" in any label from closing the data block early
+        yield nodes_json.replace(b"<", b"\\u003c")
+        yield _MID3
+        yield edges_json.replace(b"<", b"\\u003c")
+        yield _POST
 
     def _create_fallback_mind_map(self, title: str, topics: List[str]) -> str:
         """Create a simple fallback mind map when generation fails"""
@@ -431,7 +614,7 @@ class MindMapGenerator:
         simple_nodes = [
             {
                 "id": "root",
-                "label": self._truncate_text(title, 30),
+                "label": _truncate_text(title, 30),
                 "color": {"background": "#4CAF50", "border": "#45a049"},
                 "font": {"size": 16, "color": "white"},
                 "shape": "ellipse",
@@ -447,7 +630,7 @@ class MindMapGenerator:
                 topic_id = f"topic_{i}"
                 simple_nodes.append({
                     "id": topic_id,
-                    "label": self._truncate_text(topic, 20),
+                    "label": _truncate_text(topic, 20),
                     "color": {"background": "#2196F3", "border": "#1976D2"},
                     "font": {"size": 14},
                     "shape": "box",
@@ -461,7 +644,7 @@ class MindMapGenerator:
                     "width": 2
                 })
 
-        return self._generate_html(simple_nodes, simple_edges, title)
+        return b"".join(self._iter_html(_dumps(simple_nodes), _dumps(simple_edges), title)).decode()
 
 
 # Factory function
@@ -8,21 +8,104 @@ import httpx
 import json
 import asyncio
 import sys
+import threading
 import os
-from typing import Dict, Any, Optional, List
+import re
+from typing import Dict, Any, AsyncIterator, Optional, List
 from datetime import datetime
 import uuid
+from collections import deque
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import jmespath
+except ImportError:
+    jmespath = None
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Compiled once per process rather than on every validation
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+# Keys commonly holding the reply text in chat API responses, by priority
+_RESP_KEY_ORDER = ('response', 'message', 'text', 'content', 'answer', 'reply')
+_RESP_KEYS = frozenset(_RESP_KEY_ORDER)
+
+# Predefined message formats, serialized once for the JSON editor
+_PRESETS = {
+    "OpenAI Compatible": {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "user", "content": "{{message}}"}
+        ]
+    },
+    "Anthropic Compatible": {
+        "model": "claude-3-sonnet-20240229",
+        "max_tokens": 1000,
+        "messages": [
+            {"role": "user", "content": "{{message}}"}
+        ]
+    },
+    "Simple Message": {
+        "message": "{{message}}"
+    },
+    "Conversation History": {
+        "message": "{{message}}",
+        "history": "{{conversation_history}}"
+    },
+}
+_DEFAULT_FORMAT = {"message": "{{message}}"}
+_PRESET_JSON = {name: json.dumps(fmt, indent=2) for name, fmt in _PRESETS.items()}
+_DEFAULT_FORMAT_JSON = json.dumps(_DEFAULT_FORMAT, indent=2)
+
+# Turns of context sent with each message; the deque evicts older ones
+# to keep the API payload from growing without bound
+_HISTORY_TURNS = 10
+
+# Common health-check routes raced by the connection test
+_PROBE_ENDPOINTS = ("health", "status", "v1/models", "")
+
+# Chat messages rendered per rerun before older ones are collapsed
+_CHAT_WINDOW = 50
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 class APIClient:
     """Generic HTTP client for external APIs"""
     
-    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30
+    ):
         self.base_url = base_url.rstrip('/')
         self.headers = headers or {}
+        # One pooled client per APIClient so keep-alive connections are
+        # reused across chat turns instead of re-handshaking every request
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=5, keepalive_expiry=30)
+        )
         
     async def post_request(
         self, 
@@ -31,17 +114,14 @@ class APIClient:
         timeout: int = 30
     ) -> Dict[str, Any]:
         """Make a POST request to the API"""
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            url = f"{self.base_url}/{endpoint.lstrip('/')}"
-            
-            response = await client.post(
-                url=url,
-                json=data,
-                headers=self.headers
-            )
-            
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.post(
+            endpoint.lstrip('/'),
+            json=data,
+            timeout=timeout
+        )
+        
+        response.raise_for_status()
+        return _loads(response.content)
     
     async def get_request(
         self, 
@@ -50,123 +130,378 @@ class APIClient:
         timeout: int = 30
     ) -> Dict[str, Any]:
         """Make a GET request to the API"""
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            url = f"{self.base_url}/{endpoint.lstrip('/')}"
-            
-            response = await client.get(
-                url=url,
-                params=params,
-                headers=self.headers
-            )
-            
+        response = await self._client.get(
+            endpoint.lstrip('/'),
+            params=params,
+            timeout=timeout
+        )
+        
+        response.raise_for_status()
+        return _loads(response.content)
+
+    async def stream_post(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        timeout: int = 30
+    ) -> AsyncIterator[str]:
+        """Make a streaming POST request, yielding reply text as it arrives"""
+        async with self._client.stream(
+            "POST",
+            endpoint.lstrip('/'),
+            json=data,
+            timeout=timeout
+        ) as response:
             response.raise_for_status()
-            return response.json()
+            async for line in response.aiter_lines():
+                text = _parse_sse(line)
+                if text:
+                    yield text
+
+    async def warm_up(self, endpoint: str, timeout: int = 5) -> None:
+        """Open a pooled connection to an endpoint without sending a chat request"""
+        await self._client.options(endpoint.lstrip('/'), timeout=timeout)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections"""
+        await self._client.aclose()
 
 
 def validate_url(url: str) -> bool:
     """Validate if the URL is properly formatted"""
     try:
-        import re
-        pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-            r'localhost|'  # localhost...
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-        return pattern.match(url) is not None
-    except:
+        # Cheap prefix and length checks reject most bad input before the regex;
+        # the scheme check stays case-insensitive like the pattern itself
+        if not url or len(url) > 2048 or not url[:8].lower().startswith(('http://', 'https://')):
+            return False
+        return _URL_RE.match(url) is not None
+    except TypeError:
         return False
 
 
+# Connection test messages by httpx error type; error bodies are truncated
+# so a large HTML error page cannot flood the page
+_ERR_FMT = {
+    httpx.HTTPStatusError: lambda e: f"❌ HTTP Error: {e.response.status_code} - {e.response.text[:200]}",
+    httpx.ConnectError: lambda e: "❌ Connection failed: Unable to connect to the server",
+    httpx.TimeoutException: lambda e: "❌ Connection timeout: Server is not responding",
+}
+
+
 async def test_api_connection(client: APIClient, test_endpoint: str) -> tuple[bool, str]:
     """Test the API connection"""
     try:
         # Try a simple GET request first
         await client.get_request(test_endpoint)
         return True, "✅ Connection successful"
-    except httpx.HTTPStatusError as e:
-        return False, f"❌ HTTP Error: {e.response.status_code} - {e.response.text}"
-    except httpx.ConnectError:
-        return False, "❌ Connection failed: Unable to connect to the server"
-    except httpx.TimeoutException:
-        return False, "❌ Connection timeout: Server is not responding"
+    except tuple(_ERR_FMT) as e:
+        # Subclasses (e.g. ConnectTimeout) resolve through the MRO
+        fmt = next(_ERR_FMT[cls] for cls in type(e).__mro__ if cls in _ERR_FMT)
+        return False, fmt(e)
     except Exception as e:
         return False, f"❌ Error: {str(e)}"
 
 
+async def probe_any(
+    client: APIClient,
+    candidates: tuple = _PROBE_ENDPOINTS
+) -> tuple[bool, str]:
+    """Test several endpoints concurrently and report the first that answers"""
+    tasks = {
+        asyncio.create_task(test_api_connection(client, endpoint)): endpoint
+        for endpoint in candidates
+    }
+    pending = set(tasks)
+    result = (False, "❌ No endpoints to test")
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result[0]:
+                    return True, f"{result[1]} (/{tasks[task]})"
+    finally:
+        # Stop the slower probes once one has answered
+        for task in pending:
+            task.cancel()
+    return result
+
+
+def build_request_data(
+    message: str,
+    message_format: Dict[str, Any],
+    history_json: str
+) -> Dict[str, Any]:
+    """Fill the message format placeholders for one chat message"""
+    # Fill placeholders with two substitutions on the serialized format.
+    # Each value is inserted in its JSON-escaped form, so it lands as
+    # string content whether the placeholder is a whole value or embedded
+    # in a longer string.
+    template = json.dumps(message_format)
+    if "{{message}}" not in template and "{{conversation_history}}" not in template:
+        # Nothing to fill in; send the format as-is without a parse round-trip
+        return message_format
+
+    filled = template.replace("{{message}}", json.dumps(message)[1:-1])
+
+    # History arrives pre-serialized (maintained incrementally per turn)
+    if "{{conversation_history}}" in filled:
+        filled = filled.replace("{{conversation_history}}", json.dumps(history_json)[1:-1])
+
+    return json.loads(filled)
+
+
+def dump_history(history_user: List[str], history_assistant: List[str]) -> str:
+    """Serialize the user/assistant columns as the documented list of turns"""
+    return json.dumps([
+        {"user": user, "assistant": assistant}
+        for user, assistant in zip(history_user, history_assistant)
+    ])
+
+
+def append_history_json(history_json: str, user: str, assistant: str) -> str:
+    """Append one turn to serialized history without re-encoding earlier turns"""
+    turn = json.dumps({"user": user, "assistant": assistant})
+    if history_json == "[]":
+        return f"[{turn}]"
+    # Same ", " item separator json.dumps uses for the full list
+    return f"{history_json[:-1]}, {turn}]"
+
+
+def _parse_sse(line: str) -> str:
+    """Extract the text delta from one SSE or NDJSON line of a streamed reply"""
+    line = line.strip()
+    if not line or line.startswith((":", "event:", "id:", "retry:")):
+        return ""
+    if line.startswith("data:"):
+        line = line[5:].strip()
+    if line == "[DONE]":
+        return ""
+
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError:
+        # Plain text streams
+        return line + "\n"
+    if not isinstance(chunk, dict):
+        return ""
+
+    # OpenAI-compatible chat/completions deltas
+    choices = chunk.get("choices")
+    if choices and isinstance(choices[0], dict):
+        delta = choices[0].get("delta") or choices[0]
+        return str(delta.get("content") or delta.get("text") or "")
+
+    # Anthropic content_block_delta events
+    delta = chunk.get("delta")
+    if isinstance(delta, dict):
+        return str(delta.get("text") or "")
+
+    # Ollama /api/chat and /api/generate
+    message = chunk.get("message")
+    if isinstance(message, dict):
+        return str(message.get("content") or "")
+    return str(chunk.get("response") or "")
+
+
+async def stream_chat_message(
+    client: APIClient,
+    message: str,
+    chat_endpoint: str,
+    message_format: Dict[str, Any],
+    history_json: str
+) -> AsyncIterator[str]:
+    """Send a chat message to the API and yield the reply as it streams in"""
+    request_data = build_request_data(message, message_format, history_json)
+    async for text in client.stream_post(chat_endpoint, request_data):
+        yield text
+
+
+async def connect_and_warm(
+    client: APIClient,
+    test_endpoint: str,
+    chat_endpoint: str
+) -> tuple[bool, str]:
+    """Test the API and warm the chat endpoint connection concurrently"""
+    # The warm-up only opens a pooled connection, so its outcome is ignored
+    result, _ = await asyncio.gather(
+        test_api_connection(client, test_endpoint),
+        client.warm_up(chat_endpoint),
+        return_exceptions=True
+    )
+    if isinstance(result, BaseException):
+        return False, f"❌ Error: {str(result)}"
+    return result
+
+
+def _extract_response_text(response: Any) -> str:
+    """Find the reply text in a response of unknown shape"""
+    response_text = ""
+    if isinstance(response, dict):
+        # Common response patterns, found with one set intersection
+        hit = _RESP_KEYS & response.keys()
+        if hit:
+            # Several matches fall back to the documented priority order
+            key = next(iter(hit)) if len(hit) == 1 else next(k for k in _RESP_KEY_ORDER if k in hit)
+            response_text = str(response[key])
+        
+        if not response_text:
+            # If no standard key found, try to get the first string value
+            for value in response.values():
+                if isinstance(value, str) and len(value) > 0:
+                    response_text = value
+                    break
+            
+            # If still no response, return the full JSON
+            if not response_text:
+                response_text = json.dumps(response, indent=2)
+    else:
+        response_text = str(response)
+    
+    return response_text
+
+
 async def send_chat_message(
     client: APIClient,
     message: str,
     chat_endpoint: str,
     message_format: Dict[str, Any],
-    conversation_history: List[Dict[str, str]]
+    history_json: str,
+    response_expr: Optional[Any] = None
 ) -> tuple[bool, str]:
     """Send a chat message to the API"""
     try:
-        # Prepare the request data based on the message format
-        request_data = message_format.copy()
-        
-        # Replace placeholders in the message format
-        def replace_placeholders(obj, message_text, history):
-            if isinstance(obj, dict):
-                return {k: replace_placeholders(v, message_text, history) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_placeholders(item, message_text, history) for item in obj]
-            elif isinstance(obj, str):
-                obj = obj.replace("{{message}}", message_text)
-                obj = obj.replace("{{conversation_history}}", json.dumps(history))
-                return obj
-            return obj
-        
-        request_data = replace_placeholders(request_data, message, conversation_history)
+        request_data = build_request_data(message, message_format, history_json)
         
         # Send the request
         response = await client.post_request(chat_endpoint, request_data)
         
-        # Extract the response text (this might need customization based on API response format)
-        response_text = ""
-        if isinstance(response, dict):
-            # Common response patterns
-            possible_keys = ['response', 'message', 'text', 'content', 'answer', 'reply']
-            for key in possible_keys:
-                if key in response:
-                    response_text = str(response[key])
-                    break
-            
-            if not response_text:
-                # If no standard key found, try to get the first string value
-                for value in response.values():
-                    if isinstance(value, str) and len(value) > 0:
-                        response_text = value
-                        break
-                
-                # If still no response, return the full JSON
-                if not response_text:
-                    response_text = json.dumps(response, indent=2)
-        else:
-            response_text = str(response)
+        # A configured response path reads the reply directly; otherwise (or
+        # when it finds nothing) fall back to guessing from common shapes
+        if response_expr is not None:
+            found = response_expr.search(response)
+            if found is not None:
+                return True, found if isinstance(found, str) else json.dumps(found, indent=2)
         
-        return True, response_text
+        return True, _extract_response_text(response)
         
     except Exception as e:
         return False, f"Error sending message: {str(e)}"
 
 
+@st.cache_resource
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start one long-lived event loop on a daemon thread, shared across reruns"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="custom-chat-api-loop", daemon=True).start()
+    return loop
+
+
 def run_async(coro):
     """Run async function in sync context"""
+    # httpx pools are bound to the loop that created their connections, so
+    # every coroutine goes to the same persistent loop
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def run_async_iter(agen):
+    """Iterate an async generator from sync code on the persistent loop"""
+    async def _next():
+        try:
+            return True, await agen.__anext__()
+        except StopAsyncIteration:
+            return False, None
+
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is running, use thread executor
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, coro)
-                return future.result()
-        else:
-            return loop.run_until_complete(coro)
-    except RuntimeError:
-        return asyncio.run(coro)
+        while True:
+            has_item, item = run_async(_next())
+            if not has_item:
+                return
+            yield item
+    finally:
+        run_async(agen.aclose())
+
+
+# No max_entries: an evicted APIClient would never be aclose()d, leaking its httpx pool
+@st.cache_resource
+def get_api_client(base_url: str, headers_items: tuple) -> APIClient:
+    """Get a pooled API client shared by every session with the same config"""
+    return APIClient(base_url, dict(headers_items))
+
+
+@st.cache_resource(max_entries=16)
+def _compile_response_path(path: str):
+    """Compile a JMESPath response path once and reuse it for every reply"""
+    return jmespath.compile(path)
+
+
+@st.cache_data(max_entries=16)
+def _parse_format(text: str) -> Dict[str, Any]:
+    """Parse the message format JSON, cached on the raw text across reruns"""
+    return json.loads(text)
+
+
+@st.cache_data
+def _help_markdown() -> str:
+    """Static help and example formats, built once and served from cache"""
+    return """
+    ### How to use Custom Chat API
+    
+    1. **Configure API Settings**: Enter your API base URL and endpoints
+    2. **Set Authentication**: Add necessary headers for authentication
+    3. **Configure Message Format**: Customize how messages are sent to your API
+    4. **Test Connection**: Verify your API is accessible
+    5. **Connect & Chat**: Start chatting with your custom API
+    
+    ### Common API Formats
+    
+    **OpenAI Compatible:**
+    ```json
+    {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "user", "content": "{{message}}"}
+        ]
+    }
+    ```
+    
+    **Simple REST API:**
+    ```json
+    {
+        "message": "{{message}}",
+        "user_id": "user123"
+    }
+    ```
+    
+    **With Conversation History:**
+    ```json
+    {
+        "query": "{{message}}",
+        "context": "{{conversation_history}}"
+    }
+    ```
+    
+    ### Supported Placeholders
+    - `{{message}}`: The user's current message
+    - `{{conversation_history}}`: JSON string of previous conversation
+    
+    ### Examples of Compatible APIs
+    - OpenAI API
+    - Anthropic Claude API
+    - Local LLMs (Ollama, LM Studio)
+    - Custom chatbot APIs
+    - Azure OpenAI Service
+    - Google Bard API
+    """
+
+
+def _response_path_ok(path: str) -> bool:
+    """Check that a response path compiles"""
+    try:
+        _compile_response_path(path)
+        return True
+    except jmespath.exceptions.ParseError:
+        return False
 
 
 # Streamlit Page Configuration
@@ -192,8 +527,11 @@ if "api_client" not in st.session_state:
     st.session_state.api_client = None
 if "api_connected" not in st.session_state:
     st.session_state.api_connected = False
-if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
+if "hist_user" not in st.session_state:
+    st.session_state.hist_user = deque(maxlen=_HISTORY_TURNS)
+    st.session_state.hist_asst = deque(maxlen=_HISTORY_TURNS)
+if "history_json" not in st.session_state:
+    st.session_state.history_json = dump_history(st.session_state.hist_user, st.session_state.hist_asst)
 if "chat_messages" not in st.session_state:
     st.session_state.chat_messages = []
 
@@ -223,6 +561,22 @@ with st.expander("API Settings", expanded=not st.session_state.api_connected):
             placeholder="health",
             help="Endpoint to test connection (e.g., 'health', 'status')"
         )
+        
+        response_path = st.text_input(
+            "Response Path (optional)",
+            placeholder="choices[0].message.content",
+            disabled=jmespath is None,
+            help="JMESPath expression locating the reply text in the response JSON. "
+                 "Leave empty to detect common response keys automatically."
+                 + ("" if jmespath is not None else " Requires the jmespath package.")
+        ).strip()
+        
+        stream_responses = st.checkbox(
+            "Stream responses",
+            value=False,
+            help="Show the reply as it arrives (SSE or NDJSON). Enable streaming in the "
+                 "message format too, e.g. \"stream\": true for OpenAI-compatible APIs."
+        )
     
     with col2:
         # API Headers
@@ -265,58 +619,22 @@ st.markdown("Configure how messages are sent to your API. Use `{{message}}` as p
 
 format_preset = st.selectbox(
     "Format Preset",
-    [
-        "Custom",
-        "OpenAI Compatible",
-        "Anthropic Compatible", 
-        "Simple Message",
-        "Conversation History"
-    ]
+    ["Custom", *_PRESETS]
 )
 
-# Predefined formats
-if format_preset == "OpenAI Compatible":
-    message_format = {
-        "model": "gpt-3.5-turbo",
-        "messages": [
-            {"role": "user", "content": "{{message}}"}
-        ]
-    }
-elif format_preset == "Anthropic Compatible":
-    message_format = {
-        "model": "claude-3-sonnet-20240229",
-        "max_tokens": 1000,
-        "messages": [
-            {"role": "user", "content": "{{message}}"}
-        ]
-    }
-elif format_preset == "Simple Message":
-    message_format = {
-        "message": "{{message}}"
-    }
-elif format_preset == "Conversation History":
-    message_format = {
-        "message": "{{message}}",
-        "history": "{{conversation_history}}"
-    }
-else:  # Custom
-    message_format = {
-        "message": "{{message}}"
-    }
-
 # JSON editor for message format
 message_format_json = st.text_area(
     "Message Format (JSON)",
-    value=json.dumps(message_format, indent=2),
+    value=_PRESET_JSON.get(format_preset, _DEFAULT_FORMAT_JSON),
     height=150,
     help="JSON format for sending messages. Use {{message}} placeholder for user input."
 )
 
 try:
-    message_format = json.loads(message_format_json)
+    message_format = _parse_format(message_format_json)
 except json.JSONDecodeError as e:
     st.error(f"Invalid JSON format: {e}")
-    message_format = {"message": "{{message}}"}
+    message_format = dict(_DEFAULT_FORMAT)
 
 # Connection Controls
 col1, col2, col3 = st.columns(3)
@@ -329,8 +647,10 @@ with col1:
             st.error("Please enter a valid URL")
         else:
             with st.spinner("Testing connection..."):
-                client = APIClient(api_url, headers)
-                success, message = run_async(test_api_connection(client, test_endpoint))
+                client = get_api_client(api_url, tuple(sorted(headers.items())))
+                # Race the configured endpoint against common health routes
+                candidates = tuple(dict.fromkeys((test_endpoint, *_PROBE_ENDPOINTS)))
+                success, message = run_async(probe_any(client, candidates))
                 
                 if success:
                     st.success(message)
@@ -343,20 +663,34 @@ with col2:
             st.error("Please enter an API URL")
         elif not validate_url(api_url):
             st.error("Please enter a valid URL")
+        elif response_path and not _response_path_ok(response_path):
+            st.error(f"Invalid response path: {response_path}")
         else:
-            st.session_state.api_client = APIClient(api_url, headers)
+            client = get_api_client(api_url, tuple(sorted(headers.items())))
+            with st.spinner("Connecting..."):
+                _, st.session_state.api_check = run_async(
+                    connect_and_warm(client, test_endpoint, chat_endpoint)
+                )
+            st.session_state.api_client = client
             st.session_state.api_connected = True
             st.session_state.api_url = api_url
             st.session_state.chat_endpoint = chat_endpoint
+            st.session_state.stream_responses = stream_responses
+            st.session_state.response_path = response_path
             st.session_state.message_format = message_format
             st.success("✅ Connected to API!")
             st.rerun()
 
 with col3:
     if st.button("🔌 Disconnect"):
+        # Clients are shared through the resource cache, so they are only
+        # released here, not closed
         st.session_state.api_client = None
         st.session_state.api_connected = False
-        st.session_state.conversation_history = []
+        st.session_state.pop("api_check", None)
+        st.session_state.hist_user = deque(maxlen=_HISTORY_TURNS)
+        st.session_state.hist_asst = deque(maxlen=_HISTORY_TURNS)
+        st.session_state.history_json = "[]"
         st.session_state.chat_messages = []
         st.success("Disconnected from API")
         st.rerun()
@@ -364,23 +698,44 @@ with col3:
 # Connection Status
 if st.session_state.api_connected:
     st.success(f"🟢 Connected to: {st.session_state.api_url}")
+    if st.session_state.get("api_check"):
+        st.caption(f"Connection check: {st.session_state.api_check}")
 else:
     st.warning("🔴 Not connected to any API")
 
 st.markdown("---")
 
 # Chat Interface
-if st.session_state.api_connected:
+@st.fragment
+def chat_panel():
+    """Chat history and input; reruns on its own so chat turns skip the config UI"""
     st.markdown("### 💬 Chat Interface")
     
     # Clear chat button
     if st.button("🗑️ Clear Chat History"):
         st.session_state.chat_messages = []
-        st.session_state.conversation_history = []
-        st.rerun()
+        st.session_state.show_older_messages = False
+        st.session_state.hist_user = deque(maxlen=_HISTORY_TURNS)
+        st.session_state.hist_asst = deque(maxlen=_HISTORY_TURNS)
+        st.session_state.history_json = "[]"
+        st.rerun(scope="fragment")
     
-    # Display chat messages
-    for message in st.session_state.chat_messages:
+    # Display chat messages; only the latest window is rendered unless the
+    # user asks for the earlier ones
+    messages = st.session_state.chat_messages
+    hidden = len(messages) - _CHAT_WINDOW
+    if hidden > 0:
+        if st.session_state.get("show_older_messages"):
+            if st.button("⬇️ Hide earlier messages"):
+                st.session_state.show_older_messages = False
+                st.rerun(scope="fragment")
+        else:
+            if st.button(f"⬆️ Show {hidden} earlier messages"):
+                st.session_state.show_older_messages = True
+                st.rerun(scope="fragment")
+            messages = messages[-_CHAT_WINDOW:]
+
+    for message in messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
             if "timestamp" in message:
@@ -389,7 +744,7 @@ if st.session_state.api_connected:
     # Chat input
     if prompt := st.chat_input("Type your message here..."):
         # Add user message to chat history
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
         user_message = {
             "role": "user", 
             "content": prompt,
@@ -404,103 +759,75 @@ if st.session_state.api_connected:
         
         # Send message to API
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                success, response = run_async(
-                    send_chat_message(
-                        st.session_state.api_client,
-                        prompt,
-                        st.session_state.chat_endpoint,
-                        st.session_state.message_format,
-                        st.session_state.conversation_history
+            chat_args = (
+                st.session_state.api_client,
+                prompt,
+                st.session_state.chat_endpoint,
+                st.session_state.message_format,
+                st.session_state.history_json
+            )
+            if st.session_state.get("stream_responses"):
+                # Paint tokens as they arrive instead of waiting for the full body
+                try:
+                    response = st.write_stream(run_async_iter(stream_chat_message(*chat_args))) or ""
+                    success = True
+                except Exception as e:
+                    success, response = False, f"Error sending message: {str(e)}"
+            else:
+                response_path = st.session_state.get("response_path")
+                response_expr = _compile_response_path(response_path) if response_path else None
+                with st.spinner("Thinking..."):
+                    success, response = run_async(
+                        send_chat_message(*chat_args, response_expr=response_expr)
                     )
-                )
-                
                 if success:
                     st.markdown(response)
-                    response_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    st.caption(f"📅 {response_timestamp}")
-                    
-                    # Add assistant response to chat history
-                    assistant_message = {
-                        "role": "assistant",
-                        "content": response,
-                        "timestamp": response_timestamp
-                    }
-                    st.session_state.chat_messages.append(assistant_message)
-                    
-                    # Update conversation history for context
-                    st.session_state.conversation_history.append({
-                        "user": prompt,
-                        "assistant": response
-                    })
-                    
-                    # Limit conversation history to prevent API payload from being too large
-                    if len(st.session_state.conversation_history) > 10:
-                        st.session_state.conversation_history = st.session_state.conversation_history[-10:]
-                    
+
+            # Same "YYYY-MM-DD HH:MM:SS" text as strftime, computed once per reply
+            response_timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+            if success:
+                st.caption(f"📅 {response_timestamp}")
+                
+                # Add assistant response to chat history
+                assistant_message = {
+                    "role": "assistant",
+                    "content": response,
+                    "timestamp": response_timestamp
+                }
+                st.session_state.chat_messages.append(assistant_message)
+                
+                # Update conversation history for context
+                hist_user = st.session_state.hist_user
+                hist_asst = st.session_state.hist_asst
+                evicting = len(hist_user) == hist_user.maxlen
+                hist_user.append(prompt)
+                hist_asst.append(response)
+                if evicting:
+                    # Oldest turn dropped out of the window; re-dump once
+                    st.session_state.history_json = dump_history(hist_user, hist_asst)
                 else:
-                    st.error(response)
-                    error_message = {
-                        "role": "assistant",
-                        "content": f"❌ Error: {response}",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    st.session_state.chat_messages.append(error_message)
+                    st.session_state.history_json = append_history_json(
+                        st.session_state.history_json, prompt, response
+                    )
+                
+            else:
+                st.error(response)
+                error_message = {
+                    "role": "assistant",
+                    "content": f"❌ Error: {response}",
+                    "timestamp": response_timestamp
+                }
+                st.session_state.chat_messages.append(error_message)
         
-        st.rerun()
+        st.rerun(scope="fragment")
 
+
+if st.session_state.api_connected:
+    chat_panel()
 else:
     st.info("👆 Please configure and connect to an API to start chatting!")
 
 # Help Section
 st.markdown("---")
 with st.expander("ℹ️ Help & Examples"):
-    st.markdown("""
-    ### How to use Custom Chat API
-    
-    1. **Configure API Settings**: Enter your API base URL and endpoints
-    2. **Set Authentication**: Add necessary headers for authentication
-    3. **Configure Message Format**: Customize how messages are sent to your API
-    4. **Test Connection**: Verify your API is accessible
-    5. **Connect & Chat**: Start chatting with your custom API
-    
-    ### Common API Formats
-    
-    **OpenAI Compatible:**
-    ```json
-    {
-        "model": "gpt-3.5-turbo",
-        "messages": [
-            {"role": "user", "content": "{{message}}"}
-        ]
-    }
-    ```
-    
-    **Simple REST API:**
-    ```json
-    {
-        "message": "{{message}}",
-        "user_id": "user123"
-    }
-    ```
-    
-    **With Conversation History:**
-    ```json
-    {
-        "query": "{{message}}",
-        "context": "{{conversation_history}}"
-    }
-    ```
-    
-    ### Supported Placeholders
-    - `{{message}}`: The user's current message
-    - `{{conversation_history}}`: JSON string of previous conversation
-    
-    ### Examples of Compatible APIs
-    - OpenAI API
-    - Anthropic Claude API
-    - Local LLMs (Ollama, LM Studio)
-    - Custom chatbot APIs
-    - Azure OpenAI Service
-    - Google Bard API
-    """)
+    st.markdown(_help_markdown())
@@ -4,12 +4,19 @@ Replaces LlamaCloud index functionality with local PostgreSQL + pgvector
 """
 
 import os
+import io
+import csv
 import json
-from typing import List, Optional, Dict, Any, Tuple
+import hashlib
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from dataclasses import dataclass
+from collections import OrderedDict
+from itertools import batched
 import asyncio
+import threading
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import (
     create_engine, 
@@ -20,12 +27,21 @@ from sqlalchemy import (
     DateTime, 
     Float,
     JSON,
-    Boolean
+    Boolean,
+    LargeBinary,
+    Computed,
+    ForeignKey,
+    Index,
+    func,
+    make_url,
+    select,
+    text
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session, defer, deferred, noload, relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, insert as pg_insert
+from pgvector.sqlalchemy import Vector, HALFVEC
 import uuid
 
 from llama_index.core import Document, VectorStoreIndex, Settings
@@ -43,6 +59,11 @@ load_dotenv()
 
 Base = declarative_base()
 
+# to_tsvector raises once a tsvector passes 1 MB, so only a bounded prefix of
+# the content is indexed (200k chars stays under the limit even at 4 bytes/char)
+_TSV_MAX_CHARS = 200_000
+_TSV_EXPRESSION = f"to_tsvector('english', left(coalesce(content, ''), {_TSV_MAX_CHARS}))"
+
 
 class DocumentRecord(Base):
     """Enhanced document record with embeddings support"""
@@ -62,8 +83,18 @@ class DocumentRecord(Base):
     extracted_images = Column(JSON, nullable=True)
     
     # Embedding fields
-    content_embedding = Column(Vector(1536), nullable=True)  # OpenAI embeddings dimension
-    summary_embedding = Column(Vector(1536), nullable=True)
+    # fp16 halfvec halves storage and distance bandwidth vs vector
+    content_embedding = Column(HALFVEC(1536), nullable=True)  # OpenAI embeddings dimension
+    summary_embedding = Column(HALFVEC(1536), nullable=True)
+    
+    # Full-text search vector, generated by Postgres and never loaded
+    content_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(_TSV_EXPRESSION, persisted=True)
+    ))
+    
+    # Chunks for a batch of records load in one WHERE document_id IN (...) query
+    chunks = relationship("DocumentChunk", lazy="selectin", order_by="DocumentChunk.chunk_index")
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -77,15 +108,16 @@ class DocumentRecord(Base):
 class DocumentChunk(Base):
     """Document chunks for better retrieval"""
     __tablename__ = "document_chunks"
+    __table_args__ = (Index("ix_document_chunks_document_id", "document_id"),)
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    document_id = Column(String, nullable=False)
+    document_id = Column(String, ForeignKey("documents_enhanced.id"), nullable=False)
     chunk_text = Column(Text, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     chunk_type = Column(String, default="text")  # text, table, image_caption, etc.
     
     # Embedding
-    embedding = Column(Vector(1536), nullable=True)
+    embedding = Column(HALFVEC(1536), nullable=True)
     
     # Metadata
     doc_metadata = Column(JSON, nullable=True)
@@ -94,6 +126,85 @@ class DocumentChunk(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class EmbeddingCacheRecord(Base):
+    """Embedding vectors keyed by SHA-256 of model name and text"""
+    __tablename__ = "embedding_cache"
+    
+    hash = Column(LargeBinary, primary_key=True)
+    model = Column(Text, nullable=False)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Column order for the chunk COPY
+_CHUNK_COLUMNS = ("id", "document_id", "chunk_text", "chunk_index", "chunk_type", "embedding", "doc_metadata", "created_at")
+
+
+def _vector_literal(embedding: Optional[List[float]]) -> Optional[str]:
+    """Format an embedding as pgvector text input"""
+    if embedding is None:
+        return None
+    return "[" + ",".join(map(repr, embedding)) + "]"
+
+
+def _chunk_bounds(words: List[str], max_chunk_size: int) -> List[Tuple[int, int]]:
+    """Greedy (start, stop) word ranges of at least max_chunk_size characters"""
+    # ends[k] is the character length of words[:k], counting one space per word
+    ends = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, words), dtype=np.int64, count=len(words)) + 1, out=ends[1:])
+    bounds = []
+    start = 0
+    while start < len(words):
+        stop = min(int(np.searchsorted(ends, ends[start] + max_chunk_size)), len(words))
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _iter_windows(words: List[str], size: int, step: int) -> Iterator[Tuple[int, str]]:
+    """Yield (start, text) for overlapping word windows, skipping blank ones"""
+    for i in range(0, len(words), step):
+        chunk_text = ' '.join(words[i:i + size])
+        if chunk_text.strip():
+            yield i, chunk_text
+
+
+# Chunks embedded and written per round-trip, keeping memory flat on long documents
+_EMBED_BATCH_SIZE = 64
+
+
+# Engine options shared by both engines: a larger compiled-statement cache
+# than SQLAlchemy's default of 500
+_ENGINE_OPTIONS = {"pool_pre_ping": True, "query_cache_size": 1200}
+
+# Only the async engine carries ingestion and search, so only it gets the
+# large pool; the sync engine (DDL, listings, embedding cache) stays small so
+# both plus PGVectorStore's own engines fit under max_connections=100
+_ASYNC_POOL_OPTIONS = {"pool_size": 20, "max_overflow": 40}
+_SYNC_POOL_OPTIONS = {"pool_size": 2, "max_overflow": 3}
+
+
+# In-process embedding cache size, in front of the embedding_cache table
+_EMBEDDING_LRU_SIZE = 4096
+
+
+# HNSW indexes for the vector columns: (index name, table, column)
+_HNSW_INDEXES = (
+    ("ix_documents_enhanced_content_embedding_hnsw", "documents_enhanced", "content_embedding"),
+    ("ix_documents_enhanced_summary_embedding_hnsw", "documents_enhanced", "summary_embedding"),
+    ("ix_document_chunks_embedding_hnsw", "document_chunks", "embedding"),
+)
+
+
+def configure_hnsw_params(row_count: int) -> Dict[str, int]:
+    """Pick HNSW build and search parameters for a table size"""
+    if row_count < 100_000:
+        return {"m": 16, "ef_construction": 64, "ef_search": 40}
+    if row_count < 1_000_000:
+        return {"m": 24, "ef_construction": 128, "ef_search": 100}
+    return {"m": 32, "ef_construction": 200, "ef_search": 200}
+
+
 @dataclass
 class EnhancedDocument:
     """Enhanced document container"""
@@ -125,11 +236,25 @@ class PostgreSQLDocumentManager:
     ):
         # Database setup
         self.database_url = database_url or self._build_database_url()
-        self.engine = create_engine(self.database_url)
+        self.engine = create_engine(self.database_url, **_ENGINE_OPTIONS, **_SYNC_POOL_OPTIONS)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
+        # asyncpg connections are bound to the loop that opened them and callers
+        # use a fresh asyncio.run per call, so all async DB work runs on one
+        # persistent loop thread that owns the single async engine
+        self._db_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._db_loop.run_forever, name="pg-async-loop", daemon=True).start()
+        self.async_engine = create_async_engine(
+            make_url(self.database_url).set(drivername="postgresql+asyncpg"),
+            **_ENGINE_OPTIONS,
+            **_ASYNC_POOL_OPTIONS
+        )
+        
         # Create tables
         Base.metadata.create_all(bind=self.engine)
+        self.hnsw_ef_search = 40
+        self._create_vector_indexes()
+        self._create_text_search_index()
         
         # Embedding setup
         if os.getenv("OPENAI_API_KEY"):
@@ -147,6 +272,9 @@ class PostgreSQLDocumentManager:
             
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self._embedding_lru: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        # _embed_batch runs in asyncio.to_thread workers concurrently
+        self._embedding_lru_lock = threading.Lock()
         
         # Initialize vector store
         self._init_vector_store()
@@ -161,6 +289,67 @@ class PostgreSQLDocumentManager:
         
         return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}"
 
+    def _create_vector_indexes(self):
+        """Create HNSW indexes so similarity queries avoid sequential scans"""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("SET LOCAL maintenance_work_mem = '2GB'"))
+                for index_name, table, column in _HNSW_INDEXES:
+                    # Migrate fp32 columns from older installs to halfvec; the
+                    # old index uses vector_cosine_ops so it must go first
+                    column_type = conn.execute(text(
+                        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                        "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+                    ), {"table": table, "column": column}).scalar()
+                    if column_type and column_type.startswith("vector"):
+                        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                        conn.execute(text(
+                            f"ALTER TABLE {table} ALTER COLUMN {column} "
+                            f"TYPE halfvec(1536) USING {column}::halfvec(1536)"
+                        ))
+                    
+                    row_count = conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+                    params = configure_hnsw_params(row_count)
+                    if column == "content_embedding":
+                        self.hnsw_ef_search = max(self.hnsw_ef_search, params["ef_search"])
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+                        f"USING hnsw ({column} halfvec_cosine_ops) "
+                        f"WITH (m = {params['m']}, ef_construction = {params['ef_construction']})"
+                    ))
+        except Exception as e:
+            print(f"Warning: Could not create HNSW indexes: {e}")
+
+    def _create_text_search_index(self):
+        """Add the tsvector column and lookup indexes missing on older installs"""
+        try:
+            with self.engine.begin() as conn:
+                # Columns generated from the unbounded content are rebuilt
+                # (dropping the column also drops its GIN index)
+                expression = conn.execute(text(
+                    "SELECT generation_expression FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() "
+                    "AND table_name = 'documents_enhanced' AND column_name = 'content_tsv'"
+                )).scalar()
+                # Postgres deparses left(...) as "left"(...), so match the bound itself
+                if expression is not None and str(_TSV_MAX_CHARS) not in expression:
+                    conn.execute(text("ALTER TABLE documents_enhanced DROP COLUMN content_tsv"))
+                conn.execute(text(
+                    "ALTER TABLE documents_enhanced ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+                    f"GENERATED ALWAYS AS ({_TSV_EXPRESSION}) STORED"
+                ))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_documents_enhanced_content_tsv "
+                    "ON documents_enhanced USING GIN (content_tsv)"
+                ))
+                # create_all skips existing tables, so older installs need this explicitly
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_document_chunks_document_id "
+                    "ON document_chunks (document_id)"
+                ))
+        except Exception as e:
+            print(f"Warning: Could not create text search index: {e}")
+
     def _init_vector_store(self):
         """Initialize PGVector store for vector search"""
         try:
@@ -201,9 +390,82 @@ class PostgreSQLDocumentManager:
         """Get database session"""
         return self.SessionLocal()
 
+    def get_async_session(self) -> AsyncSession:
+        """Get an asyncpg-backed session (use only on the DB loop)"""
+        return AsyncSession(self.async_engine, autoflush=False, expire_on_commit=False)
+
+    def _on_db_loop(self, coro) -> "asyncio.Future":
+        """Run coro on the persistent DB loop; awaitable from any event loop"""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._db_loop))
+
+    def _embedding_key(self, text: str) -> bytes:
+        """Cache key for an embedding of text under the current model"""
+        return hashlib.sha256((self.embedding_model.model_name + "\x00" + text).encode()).digest()
+
+    def _embed(self, text: str, persist: bool = False) -> List[float]:
+        """Embed a single text through the embedding cache"""
+        return self._embed_batch([text], persist)[0]
+
+    def _embed_batch(self, texts: List[str], persist: bool = False) -> List[List[float]]:
+        """Embed texts, reusing cached vectors and batching only the misses"""
+        # Only document text (persist=True) uses the embedding_cache table;
+        # one-off texts such as search queries stay in the in-process LRU
+        keys = [self._embedding_key(t) for t in texts]
+        found: Dict[bytes, List[float]] = {}
+        with self._embedding_lru_lock:
+            for key in keys:
+                if key in self._embedding_lru:
+                    self._embedding_lru.move_to_end(key)
+                    found[key] = self._embedding_lru[key]
+        
+        lookup = [key for key in dict.fromkeys(keys) if key not in found]
+        if lookup and persist:
+            session = self.get_session()
+            try:
+                rows = session.query(EmbeddingCacheRecord.hash, EmbeddingCacheRecord.embedding).filter(
+                    EmbeddingCacheRecord.hash.in_(lookup)
+                ).all()
+                found.update((bytes(key), embedding.tolist()) for key, embedding in rows)
+            except Exception as e:
+                print(f"Warning: Could not read embedding cache: {e}")
+            finally:
+                session.close()
+        
+        misses = {key: t for key, t in zip(keys, texts) if key not in found}
+        if misses:
+            embeddings = self.embedding_model.get_text_embedding_batch(list(misses.values()), show_progress=False)
+            computed = dict(zip(misses, embeddings))
+            found.update(computed)
+        
+        if misses and persist:
+            session = self.get_session()
+            try:
+                session.execute(
+                    pg_insert(EmbeddingCacheRecord)
+                    .values([
+                        {"hash": key, "model": self.embedding_model.model_name, "embedding": embedding}
+                        for key, embedding in computed.items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=["hash"])
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Warning: Could not write embedding cache: {e}")
+            finally:
+                session.close()
+        
+        with self._embedding_lru_lock:
+            for key in dict.fromkeys(keys):
+                self._embedding_lru[key] = found[key]
+                self._embedding_lru.move_to_end(key)
+            while len(self._embedding_lru) > _EMBEDDING_LRU_SIZE:
+                self._embedding_lru.popitem(last=False)
+        
+        return [found[key] for key in keys]
+
     async def put_document(self, document: EnhancedDocument) -> str:
         """Store enhanced document with embeddings"""
-        session = self.get_session()
         try:
             # Generate embeddings if model is available
             content_embedding = None
@@ -214,7 +476,7 @@ class PostgreSQLDocumentManager:
                     # Only generate summary embedding here (content will be chunked later)
                     # Don't embed full content as it may exceed token limits
                     content_embedding = None  # Will be handled by chunks in _add_to_vector_store
-                    summary_embedding = self.embedding_model.get_text_embedding(document.summary)
+                    summary_embedding = await asyncio.to_thread(self._embed, document.summary, True)
                     print(f"Generated summary embedding: {len(summary_embedding) if summary_embedding else 0} dimensions")
                 except Exception as e:
                     print(f"Warning: Could not generate embeddings: {e}")
@@ -238,131 +500,157 @@ class PostgreSQLDocumentManager:
                 is_processed=document.is_processed,
             )
             
-            session.add(doc_record)
-            session.commit()
+            # Split once and share the word list between both chunkers
+            words = document.content.split()
             
-            # Create document chunks for better retrieval
-            await self._create_document_chunks(document.id, document.content, session)
+            await self._on_db_loop(self._store_record(doc_record, words))
             
             # Add to vector store
             if self.vector_store and document.content:
-                await self._add_to_vector_store(document)
+                await self._add_to_vector_store(document, words)
             
             return document.id
             
         except Exception as e:
-            session.rollback()
             raise Exception(f"Error storing document: {str(e)}")
-        finally:
-            session.close()
 
-    async def _create_document_chunks(self, document_id: str, content: str, session: Session):
+    async def _store_record(self, doc_record: DocumentRecord, words: List[str]):
+        """Commit the record and its chunks together in one transaction"""
+        async with self.get_async_session() as session:
+            async with session.begin():
+                session.add(doc_record)
+                await session.flush()
+                
+                # Create document chunks for better retrieval
+                await self._create_document_chunks(doc_record.id, words, session)
+
+    async def _create_document_chunks(self, document_id: str, words: List[str], session: AsyncSession):
         """Create document chunks for better retrieval"""
         if not self.embedding_model:
             return
             
         try:
             # Simple chunking strategy
-            words = content.split()
             chunk_size_words = self.chunk_size // 4  # Approximate words per chunk
             overlap_words = self.chunk_overlap // 4
+            windows = _iter_windows(words, chunk_size_words, chunk_size_words - overlap_words)
             
-            chunks = []
-            for i in range(0, len(words), chunk_size_words - overlap_words):
-                chunk_words = words[i:i + chunk_size_words]
-                chunk_text = ' '.join(chunk_words)
-                
-                if chunk_text.strip():
-                    # Generate embedding for chunk
+            created_at = datetime.utcnow()
+            
+            # Savepoint so a failed chunk insert leaves the document row intact;
+            # put_document commits both together
+            async with session.begin_nested():
+                index = 0
+                for batch in batched(windows, _EMBED_BATCH_SIZE):
+                    chunk_texts = [chunk_text for _, chunk_text in batch]
+                    
+                    # One embedding request per batch instead of one call per chunk
                     try:
-                        embedding = self.embedding_model.get_text_embedding(chunk_text)
+                        embeddings = await asyncio.to_thread(self._embed_batch, chunk_texts, True)
                     except Exception as e:
-                        print(f"Warning: Could not generate chunk embedding: {e}")
-                        embedding = None
+                        print(f"Warning: Could not generate chunk embeddings: {e}")
+                        embeddings = [None] * len(chunk_texts)
                     
-                    chunk_record = DocumentChunk(
-                        document_id=document_id,
-                        chunk_text=chunk_text,
-                        chunk_index=len(chunks),
-                        embedding=embedding,
-                        doc_metadata={"chunk_word_start": i, "chunk_word_end": i + chunk_size_words}
-                    )
-                    chunks.append(chunk_record)
-            
-            session.add_all(chunks)
-            session.commit()
+                    rows = []
+                    for (i, chunk_text), embedding in zip(batch, embeddings):
+                        rows.append((
+                            str(uuid.uuid4()),
+                            document_id,
+                            chunk_text,
+                            index,
+                            "text",
+                            _vector_literal(embedding),
+                            json.dumps({"chunk_word_start": i, "chunk_word_end": i + chunk_size_words}),
+                            created_at,
+                        ))
+                        index += 1
+                    
+                    await self._insert_chunk_rows(session, rows)
             
         except Exception as e:
             print(f"Warning: Could not create document chunks: {e}")
 
-    async def _add_to_vector_store(self, document: EnhancedDocument):
+    async def _insert_chunk_rows(self, session: AsyncSession, rows: List[tuple]):
+        """Bulk insert chunk rows with one CSV COPY"""
+        if not rows:
+            return
+        
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        
+        # Use the session's own asyncpg connection so the rows join its transaction
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_to_table(
+            "document_chunks",
+            source=io.BytesIO(buf.getvalue().encode()),
+            columns=list(_CHUNK_COLUMNS),
+            format="csv",
+        )
+
+    async def _add_to_vector_store(self, document: EnhancedDocument, words: Optional[List[str]] = None):
         """Add document to vector store for semantic search"""
         if not self.vector_store:
             return
 
         try:
-            # Create LlamaIndex documents with embeddings
-            doc_nodes = []
-
             # Chunk the content to avoid token limits (8192 max for embeddings)
             max_chunk_size = 3000  # Conservative size to stay well under 8192 token limit
-            content_chunks = []
-
-            # Split content into chunks
-            words = document.content.split()
-            current_chunk = []
-            current_size = 0
-
-            for word in words:
-                current_chunk.append(word)
-                current_size += len(word) + 1  # +1 for space
 
-                if current_size >= max_chunk_size:
-                    chunk_text = ' '.join(current_chunk)
-                    content_chunks.append(chunk_text)
-                    current_chunk = []
-                    current_size = 0
+            # Split content into chunk ranges; the text of each chunk is only
+            # built when its batch is processed
+            if words is None:
+                words = document.content.split()
+            bounds = _chunk_bounds(words, max_chunk_size)
+            content_chunks = (' '.join(words[start:stop]) for start, stop in bounds)
 
-            # Add remaining words
-            if current_chunk:
-                chunk_text = ' '.join(current_chunk)
-                content_chunks.append(chunk_text)
+            print(f"Splitting document into {len(bounds)} chunks for embedding")
 
-            print(f"Splitting document into {len(content_chunks)} chunks for embedding")
-            print(f"First chunk preview: {content_chunks[0][:200]}..." if content_chunks else "No chunks created")
+            created_at = document.created_at.isoformat() if document.created_at else None
+            added = 0
 
-            # Process each chunk
-            for i, chunk_text in enumerate(content_chunks):
-                chunk_embedding = None
+            # Embed and store chunks one batch at a time
+            for batch_number, batch in enumerate(batched(content_chunks, _EMBED_BATCH_SIZE)):
+                if batch_number == 0:
+                    print(f"First chunk preview: {batch[0][:200]}...")
 
+                embeddings = None
                 if self.embedding_model:
                     try:
-                        chunk_embedding = self.embedding_model.get_text_embedding(chunk_text)
+                        embeddings = await asyncio.to_thread(self._embed_batch, list(batch), True)
                     except Exception as e:
-                        print(f"Warning: Could not generate embedding for chunk {i+1}: {e}")
-                        continue  # Skip this chunk but continue with others
+                        print(f"Warning: Could not generate embeddings: {e}")
+                        continue  # Skip this batch but continue with others
+
+                # Create a node for each chunk in the batch
+                doc_nodes = [
+                    TextNode(
+                        text=chunk_text,
+                        embedding=embeddings[offset] if embeddings is not None else None,
+                        doc_metadata={
+                            "document_id": document.id,
+                            "document_name": document.document_name,
+                            "type": "content",
+                            "chunk_index": batch_number * _EMBED_BATCH_SIZE + offset,
+                            "total_chunks": len(bounds),
+                            "created_at": created_at
+                        }
+                    )
+                    for offset, chunk_text in enumerate(batch)
+                ]
+                await asyncio.to_thread(self.vector_store.add, doc_nodes)
+                added += len(doc_nodes)
 
-                # Create node for this chunk
-                chunk_node = TextNode(
-                    text=chunk_text,
-                    embedding=chunk_embedding,
-                    doc_metadata={
-                        "document_id": document.id,
-                        "document_name": document.document_name,
-                        "type": "content",
-                        "chunk_index": i,
-                        "total_chunks": len(content_chunks),
-                        "created_at": document.created_at.isoformat() if document.created_at else None
-                    }
-                )
-                doc_nodes.append(chunk_node)
+            if not bounds:
+                print("No chunks created")
 
             # Also add summary as a separate node
             if document.summary:
                 summary_embedding = None
                 if self.embedding_model:
                     try:
-                        summary_embedding = self.embedding_model.get_text_embedding(document.summary)
+                        # Already embedded by put_document, so this is a cache hit
+                        summary_embedding = await asyncio.to_thread(self._embed, document.summary, True)
                     except Exception as e:
                         print(f"Warning: Could not generate summary embedding: {e}")
 
@@ -374,32 +662,56 @@ class PostgreSQLDocumentManager:
                         "document_id": document.id,
                         "document_name": document.document_name,
                         "type": "summary",
-                        "created_at": document.created_at.isoformat() if document.created_at else None
+                        "created_at": created_at
                     }
                 )
-                doc_nodes.append(summary_node)
-            
-            # Add nodes to vector store
-            self.vector_store.add(doc_nodes)
-            print(f"Successfully added {len(doc_nodes)} nodes to vector store")
-
-            # Refresh the vector index to make new documents searchable
-            if self.vector_index:
-                # Recreate the index to ensure new documents are searchable
-                from llama_index.core import VectorStoreIndex
-                self.vector_index = VectorStoreIndex.from_vector_store(
-                    vector_store=self.vector_store
-                )
-                print("Vector index refreshed with new documents")
+                await asyncio.to_thread(self.vector_store.add, [summary_node])
+                added += 1
+
+            print(f"Successfully added {added} nodes to vector store")
+            # No index rebuild needed: PGVectorStore queries the live table
 
         except Exception as e:
             print(f"Warning: Could not add to vector store: {e}")
 
-    def get_documents(self, names: Optional[List[str]] = None) -> List[EnhancedDocument]:
-        """Retrieve documents with enhanced data"""
+    def _load_options(self, include_content: bool) -> list:
+        """Loader options that skip chunks, vectors and, optionally, the content"""
+        options = [
+            noload(DocumentRecord.chunks),
+            defer(DocumentRecord.content_embedding),
+            defer(DocumentRecord.summary_embedding),
+        ]
+        if not include_content:
+            options.append(defer(DocumentRecord.content))
+        return options
+
+    @staticmethod
+    def _to_document(record: DocumentRecord, include_content: bool = True) -> EnhancedDocument:
+        """Build an EnhancedDocument from a record ("" content when deferred)"""
+        return EnhancedDocument(
+            id=record.id,
+            document_name=record.document_name,
+            content=record.content if include_content else "",
+            summary=record.summary,
+            q_and_a=record.q_and_a,
+            mindmap=record.mindmap,
+            bullet_points=record.bullet_points,
+            doc_metadata=record.doc_metadata,
+            extracted_tables=record.extracted_tables,
+            extracted_images=record.extracted_images,
+            created_at=record.created_at,
+            is_processed=record.is_processed
+        )
+
+    def get_documents(
+        self,
+        names: Optional[List[str]] = None,
+        include_content: bool = True
+    ) -> List[EnhancedDocument]:
+        """Retrieve documents with enhanced data (include_content=False for listings)"""
         session = self.get_session()
         try:
-            query = session.query(DocumentRecord)
+            query = session.query(DocumentRecord).options(*self._load_options(include_content))
             
             if names:
                 query = query.filter(DocumentRecord.document_name.in_(names))
@@ -407,29 +719,34 @@ class PostgreSQLDocumentManager:
             query = query.order_by(DocumentRecord.created_at.desc())
             records = query.all()
             
-            documents = []
-            for record in records:
-                doc = EnhancedDocument(
-                    id=record.id,
-                    document_name=record.document_name,
-                    content=record.content,
-                    summary=record.summary,
-                    q_and_a=record.q_and_a,
-                    mindmap=record.mindmap,
-                    bullet_points=record.bullet_points,
-                    doc_metadata=record.doc_metadata,
-                    extracted_tables=record.extracted_tables,
-                    extracted_images=record.extracted_images,
-                    created_at=record.created_at,
-                    is_processed=record.is_processed
-                )
-                documents.append(doc)
-                
-            return documents
+            return [self._to_document(record, include_content) for record in records]
             
         finally:
             session.close()
 
+    def get_document_by_id(self, document_id: str) -> Optional[EnhancedDocument]:
+        """Retrieve a single document including its full content"""
+        session = self.get_session()
+        try:
+            record = (
+                session.query(DocumentRecord)
+                .options(*self._load_options(include_content=True))
+                .filter(DocumentRecord.id == document_id)
+                .one_or_none()
+            )
+            return self._to_document(record) if record else None
+        finally:
+            session.close()
+
+    def get_total_content_length(self) -> int:
+        """Total characters of stored document content, summed in SQL"""
+        session = self.get_session()
+        try:
+            total = session.query(func.sum(func.length(DocumentRecord.content))).scalar()
+            return int(total or 0)
+        finally:
+            session.close()
+
     def get_document_names(self) -> List[str]:
         """Get list of all document names"""
         session = self.get_session()
@@ -443,101 +760,83 @@ class PostgreSQLDocumentManager:
         self, 
         query: str, 
         limit: int = 5,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        include_content: bool = True
     ) -> List[Tuple[EnhancedDocument, float]]:
         """Semantic search using embeddings"""
         if not self.embedding_model:
             # Fallback to basic text search
-            return await self._basic_text_search(query, limit)
+            return await self._basic_text_search(query, limit, include_content)
         
-        session = self.get_session()
-        try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.get_text_embedding(query)
-            
-            # Search using cosine similarity
-            # This is a simplified version - you might want to use pgvector operators
-            # For now, we'll use basic filtering and return top results
-            
-            records = session.query(DocumentRecord).filter(
-                DocumentRecord.is_processed == True
-            ).limit(limit * 2).all()  # Get more records to filter
-            
-            results = []
-            for record in records:
-                if record.content_embedding is not None and len(record.content_embedding) > 0:
-                    # Calculate similarity (simplified)
-                    similarity = self._calculate_similarity(query_embedding, record.content_embedding)
-                    if similarity >= similarity_threshold:
-                        doc = EnhancedDocument(
-                            id=record.id,
-                            document_name=record.document_name,
-                            content=record.content,
-                            summary=record.summary,
-                            q_and_a=record.q_and_a,
-                            mindmap=record.mindmap,
-                            bullet_points=record.bullet_points,
-                            doc_metadata=record.doc_metadata,
-                            extracted_tables=record.extracted_tables,
-                            extracted_images=record.extracted_images,
-                            created_at=record.created_at,
-                            is_processed=record.is_processed
-                        )
-                        results.append((doc, similarity))
-            
-            # Sort by similarity and return top results
-            results.sort(key=lambda x: x[1], reverse=True)
-            return results[:limit]
-            
-        finally:
-            session.close()
+        # Generate query embedding
+        query_embedding = await asyncio.to_thread(self._embed, query)
+        return await self._on_db_loop(
+            self._vector_search(query_embedding, limit, similarity_threshold, include_content)
+        )
 
-    def _calculate_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors"""
-        import numpy as np
-        
-        try:
-            # Convert to numpy arrays
-            a = np.array(vec1)
-            b = np.array(vec2)
-            
-            # Calculate cosine similarity
-            similarity = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-            return float(similarity)
-        except:
-            return 0.0
-
-    async def _basic_text_search(self, query: str, limit: int) -> List[Tuple[EnhancedDocument, float]]:
-        """Basic text search fallback"""
-        session = self.get_session()
-        try:
-            # Simple text matching
-            records = session.query(DocumentRecord).filter(
-                DocumentRecord.content.ilike(f"%{query}%")
-            ).limit(limit).all()
-            
-            results = []
-            for record in records:
-                doc = EnhancedDocument(
-                    id=record.id,
-                    document_name=record.document_name,
-                    content=record.content,
-                    summary=record.summary,
-                    q_and_a=record.q_and_a,
-                    mindmap=record.mindmap,
-                    bullet_points=record.bullet_points,
-                    doc_metadata=record.doc_metadata,
-                    extracted_tables=record.extracted_tables,
-                    extracted_images=record.extracted_images,
-                    created_at=record.created_at,
-                    is_processed=record.is_processed
+    async def _vector_search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        similarity_threshold: float,
+        include_content: bool
+    ) -> List[Tuple[EnhancedDocument, float]]:
+        """Nearest documents by cosine distance (runs on the DB loop)"""
+        async with self.get_async_session() as session:
+            async with session.begin():
+                # Widen the HNSW candidate list for this transaction only
+                await session.execute(
+                    text("SELECT set_config('hnsw.ef_search', :n, true)"),
+                    {"n": str(max(self.hnsw_ef_search, limit))}
+                )
+                
+                # Rank in Postgres with pgvector's cosine distance operator (<=>)
+                # so the ANN index can satisfy the ORDER BY; the vectors
+                # themselves are never sent back to Python
+                distance = DocumentRecord.content_embedding.cosine_distance(query_embedding).label("distance")
+                result = await session.execute(
+                    select(DocumentRecord, distance)
+                    .options(*self._load_options(include_content))
+                    .where(
+                        DocumentRecord.is_processed == True,
+                        DocumentRecord.content_embedding.isnot(None),
+                        distance <= 1 - similarity_threshold,
+                    )
+                    .order_by(distance)
+                    .limit(limit)
                 )
-                results.append((doc, 1.0))  # Mock similarity score
                 
-            return results
+                return [(self._to_document(record, include_content), 1.0 - float(dist)) for record, dist in result]
+
+    async def _basic_text_search(
+        self,
+        query: str,
+        limit: int,
+        include_content: bool = True
+    ) -> List[Tuple[EnhancedDocument, float]]:
+        """Basic text search fallback"""
+        return await self._on_db_loop(self._text_search(query, limit, include_content))
+
+    async def _text_search(
+        self,
+        query: str,
+        limit: int,
+        include_content: bool
+    ) -> List[Tuple[EnhancedDocument, float]]:
+        """Full-text search query (runs on the DB loop)"""
+        # Full-text match served by the GIN index, ranked inside Postgres
+        ts_query = func.plainto_tsquery('english', query)
+        rank = func.ts_rank(DocumentRecord.content_tsv, ts_query).label("rank")
+        async with self.get_async_session() as session:
+            result = await session.execute(
+                select(DocumentRecord, rank)
+                .options(*self._load_options(include_content))
+                .where(DocumentRecord.content_tsv.op('@@')(ts_query))
+                .order_by(rank.desc())
+                .limit(limit)
+            )
             
-        finally:
-            session.close()
+            return [(self._to_document(record, include_content), float(score)) for record, score in result]
 
     async def query_documents(self, question: str) -> Optional[str]:
         """Query documents using the vector index"""
@@ -581,6 +880,9 @@ class PostgreSQLDocumentManager:
         """Close database connections"""
         if hasattr(self, 'engine'):
             self.engine.dispose()
+        if hasattr(self, 'async_engine'):
+            # Close the asyncpg connections on the loop that owns them
+            asyncio.run_coroutine_threadsafe(self.async_engine.dispose(), self._db_loop).result()
 
 
 # Global instance